@@ -1,7 +1,15 @@
-
 """Ingest data from various simple data sources."""
 
-from subsets_utils import get, save_raw_json
+import os
+import time
+import hashlib
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+
+from subsets_utils import stream, save_raw_stream, save_raw_json, load_raw_json, load_state, save_state
+from subsets_utils.http_client import conditional_headers, response_validators
 
 DATA_SOURCES = {
     "big_mac_index": "https://raw.githubusercontent.com/TheEconomist/big-mac-data/master/output-data/big-mac-full-index.csv",
@@ -9,16 +17,138 @@ DATA_SOURCES = {
     "pmms": "https://www.freddiemac.com/pmms/docs/PMMS_history.csv",
 }
 
+MAX_CONCURRENCY = int(os.environ.get('INGEST_MAX_CONCURRENCY', '4'))
+MAX_PER_HOST = int(os.environ.get('INGEST_MAX_PER_HOST', '2'))
+COMPRESS_RAW = os.environ.get('INGEST_COMPRESS_RAW', 'true').lower() == 'true'
+CHUNK_SIZE = 1024 * 1024
+MANIFEST_ID = "data_sources_manifest"
+STATE_ID = "data_sources"
+
+
+def _load_manifest() -> dict:
+    """The previous run's manifest, keeping only well-formed source entries."""
+    try:
+        manifest = load_raw_json(MANIFEST_ID)
+    except FileNotFoundError:
+        return {}
+    return {name: entry for name, entry in manifest.items() if isinstance(entry, dict) and "sha256" in entry}
+
+
+def _fetch(name: str, url: str, host_limits: dict, compress: bool, previous: dict | None, validators: dict) -> dict:
+    """Stream one source to its raw file, holding its host's slot for the duration.
+
+    Sends the stored validators as a conditional GET when the previous raw file
+    is known to exist; on 304 the previous manifest entry is reused untouched.
+
+    Returns the source's manifest entry.
+    """
+    headers = conditional_headers(validators) if previous else {}
+
+    with host_limits[urlparse(url).netloc]:
+        start = time.time()
+        digest = hashlib.sha256()
+        size = 0
+
+        with stream("GET", url, timeout=300.0, headers=headers) as response:
+            if response.status_code == 304:
+                return {**previous, "changed": False, "duration_s": round(time.time() - start, 2)}
+
+            response.raise_for_status()
+
+            def chunks():
+                nonlocal size
+                for chunk in response.iter_bytes(CHUNK_SIZE):
+                    digest.update(chunk)
+                    size += len(chunk)
+                    yield chunk
+
+            save_raw_stream(chunks(), name, "csv", compress=compress)
+
+        sha256 = digest.hexdigest()
+        return {
+            "url": url,
+            "format": "csv",
+            "compression": "gzip" if compress else None,
+            "bytes": size,
+            "sha256": sha256,
+            "fetched_at": datetime.now().isoformat(),
+            "duration_s": round(time.time() - start, 2),
+            "changed": not previous or previous.get("sha256") != sha256,
+            "validators": response_validators(response),
+        }
+
+
+def run(max_concurrency: int = MAX_CONCURRENCY, max_per_host: int = MAX_PER_HOST, compress: bool = COMPRESS_RAW):
+    """Fetch all data sources concurrently, streaming each to raw/{name}.csv[.gz].
+
+    Writes a small manifest (raw/data_sources_manifest.json) describing every source, so
+    transforms only ever load the one raw file they need. ETag/Last-Modified
+    validators are kept in the data_sources state and sent on the next run, so
+    unchanged sources cost a single 304.
+
+    Args:
+        max_concurrency: Maximum number of sources downloaded at once (1 = sequential)
+        max_per_host: Maximum concurrent downloads against a single host
+        compress: Gzip each raw CSV while streaming it to storage
+    """
+    host_limits = {
+        urlparse(url).netloc: threading.BoundedSemaphore(max_per_host)
+        for url in DATA_SOURCES.values()
+    }
+
+    previous_manifest = _load_manifest()
+    state = load_state(STATE_ID)
+
+    manifest = {}
+    start = time.time()
+
+    print(f"  Fetching {len(DATA_SOURCES)} sources (max {max_concurrency} concurrent, {max_per_host} per host)...")
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        futures = {
+            executor.submit(
+                _fetch, name, url, host_limits, compress,
+                previous_manifest.get(name), state.get(name, {}).get("validators", {})
+            ): name
+            for name, url in DATA_SOURCES.items()
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            entry = future.result()
+            manifest[name] = entry
+            if entry["changed"]:
+                print(f"    {name}: downloaded {entry['bytes']} bytes in {entry['duration_s']:.1f}s")
+            else:
+                print(f"    {name}: unchanged ({entry['duration_s']:.1f}s)")
+
+    print(f"  Fetched all sources in {time.time() - start:.1f}s")
+
+    save_raw_json({name: manifest[name] for name in DATA_SOURCES}, MANIFEST_ID)
+
+    state.pop("_metadata", None)
+    for name, entry in manifest.items():
+        state[name] = {
+            **state.get(name, {}),
+            "validators": entry.get("validators", {}),
+            "sha256": entry["sha256"],
+        }
+    save_state(STATE_ID, state)
+
 
-def run():
-    """Fetch all data sources."""
-    all_data = {}
+def should_transform(name: str) -> bool:
+    """Whether a source's raw data differs from what its transform last processed."""
+    entry = _load_manifest().get(name)
+    if entry is None:
+        return True
+    return load_state(STATE_ID).get(name, {}).get("transformed_sha256") != entry["sha256"]
 
-    for name, url in DATA_SOURCES.items():
-        print(f"  Fetching {name}...")
-        response = get(url, timeout=300.0)
-        response.raise_for_status()
-        all_data[name] = response.text
-        print(f"    Downloaded {len(response.text)} bytes")
 
-    save_raw_json(all_data, "data_sources", compress=True)
+def mark_transformed(name: str):
+    """Record the source hash a transform just processed, so later runs can skip
+    it for as long as the source stays unchanged."""
+    entry = _load_manifest().get(name)
+    if entry is None:
+        return
+    state = load_state(STATE_ID)
+    state.pop("_metadata", None)
+    state[name] = {**state.get(name, {}), "transformed_sha256": entry["sha256"]}
+    save_state(STATE_ID, state)
@@ -1,16 +1,39 @@
 import argparse
 
 from subsets_utils import validate_environment
+from subsets_utils.http_client import cache_stats
+from subsets_utils.io import get_table
+from subsets_utils.maintenance import maintain
 from ingest import data_sources as ingest_data
 from transforms.big_mac_index import main as transform_big_mac
 from transforms.freddie_mac import main as transform_freddie_mac
 from transforms.pmms import main as transform_pmms
 
+# (label, source name in ingest.data_sources.DATA_SOURCES, transform module)
+TRANSFORMS = [
+    ("Big Mac Index", "big_mac_index", transform_big_mac),
+    ("Freddie Mac", "freddie_mac", transform_freddie_mac),
+    ("PMMS Mortgage Rates", "pmms", transform_pmms),
+]
+
+
+def run_maintenance(dataset_id: str):
+    """Maintain a transform's table without letting a failure fail the run."""
+    if get_table(dataset_id) is None:
+        print(f"  -> Maintenance: skipped, no table for {dataset_id}")
+        return
+    try:
+        maintain(dataset_id)
+    except Exception as e:
+        print(f"  -> Maintenance: skipped {dataset_id} ({type(e).__name__}: {e})")
+
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--ingest-only", action="store_true", help="Only fetch data from API")
     parser.add_argument("--transform-only", action="store_true", help="Only transform existing raw data")
+    parser.add_argument("--force", action="store_true", help="Run transforms even if their source is unchanged")
+    parser.add_argument("--no-maintenance", action="store_true", help="Skip table compaction/vacuum/checkpoints")
     args = parser.parse_args()
 
     validate_environment()
@@ -24,12 +47,21 @@ def main():
 
     if should_transform:
         print("\n=== Phase 2: Transform ===")
-        print("\n--- Big Mac Index ---")
-        transform_big_mac.run()
-        print("\n--- Freddie Mac ---")
-        transform_freddie_mac.run()
-        print("\n--- PMMS Mortgage Rates ---")
-        transform_pmms.run()
+        for label, source, transform in TRANSFORMS:
+            print(f"\n--- {label} ---")
+            if not args.force and not ingest_data.should_transform(source):
+                print(f"  Skipping: {source} unchanged since last transform")
+                continue
+            transform.run()
+            ingest_data.mark_transformed(source)
+            if not args.no_maintenance:
+                run_maintenance(transform.DATASET_ID)
+
+    if stats := cache_stats():
+        print(
+            f"\nHTTP cache: {stats['entries']} entries, {stats['stored_bytes']:,} bytes on disk "
+            f"({stats['codec']}, ratio {stats['compression_ratio']}x, {stats['bytes_saved']:,} bytes saved)"
+        )
 
 
 if __name__ == "__main__":
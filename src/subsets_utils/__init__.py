@@ -1,14 +1,16 @@
-from .http_client import get, post, put, delete
-from .io import upload_data, load_state, save_state, load_asset, has_changed, save_raw_json, load_raw_json, save_raw_file, load_raw_file, save_raw_parquet, load_raw_parquet
+from .http_client import get, post, put, delete, stream, aget, apost, aput, adelete
+from .io import upload_data, upload_changes, load_state, save_state, load_asset, iter_asset_batches, has_changed, save_raw_json, load_raw_json, save_raw_file, load_raw_file, save_raw_stream, load_raw_bytes, save_raw_parquet, load_raw_parquet
 from .environment import validate_environment, get_data_dir
 from .publish import publish
 from .testing import validate
 from . import debug
 
 __all__ = [
-    'get', 'post', 'put', 'delete',
-    'upload_data', 'load_state', 'save_state', 'load_asset', 'has_changed',
+    'get', 'post', 'put', 'delete', 'stream',
+    'aget', 'apost', 'aput', 'adelete',
+    'upload_data', 'upload_changes', 'load_state', 'save_state', 'load_asset', 'iter_asset_batches', 'has_changed',
     'save_raw_json', 'load_raw_json', 'save_raw_file', 'load_raw_file',
+    'save_raw_stream', 'load_raw_bytes',
     'save_raw_parquet', 'load_raw_parquet',
     'validate_environment', 'get_data_dir',
     'publish',
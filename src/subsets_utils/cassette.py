@@ -0,0 +1,292 @@
+"""HTTP record/replay ("cassette") transports for offline, reproducible runs.
+
+Record mode wraps the real transport and captures every request/response,
+including streamed bodies, into a portable zip archive written at process
+exit. Replay mode serves those responses without touching the network,
+optionally simulating latency and bandwidth so end-to-end timings can be
+benchmarked offline.
+
+Enabled from http_client via:
+    HTTP_CASSETTE=path/to/run.cassette.zip
+    HTTP_CASSETTE_MODE=record|replay
+    HTTP_CASSETTE_LATENCY=0.05|recorded   (replay only, seconds per response)
+    HTTP_CASSETTE_BANDWIDTH=1048576       (replay only, bytes/second)
+"""
+
+import asyncio
+import atexit
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import zipfile
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Optional, Union
+
+import httpx
+
+REPLAY_CHUNK_SIZE = 64 * 1024
+
+
+class CassetteMissError(Exception):
+    """Raised in replay mode when a request was never recorded."""
+
+
+def _request_key(request: httpx.Request) -> str:
+    body_digest = hashlib.sha256(request.content).hexdigest()
+    return f"{request.method} {request.url} {body_digest}"
+
+
+class Cassette:
+    """A recorded set of HTTP interactions backed by a zip archive.
+
+    The archive holds index.json (one entry per interaction: method, url,
+    status, headers, elapsed, body file) plus the raw, still content-encoded
+    response bodies. Identical requests are replayed in the order they were
+    recorded; once exhausted, the last recording is repeated.
+    """
+
+    def __init__(self, path: Union[str, Path], mode: str = "replay",
+                 latency: Union[float, str, None] = None, bandwidth: Optional[float] = None):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Invalid cassette mode '{mode}'. Must be 'record' or 'replay'.")
+
+        self.path = Path(path)
+        self.mode = mode
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self._lock = threading.Lock()
+
+        if mode == "record":
+            self._body_dir = Path(tempfile.mkdtemp(prefix="cassette-"))
+            self._interactions = []
+            self._saved = False
+            atexit.register(self.save)
+        else:
+            if not self.path.exists():
+                raise FileNotFoundError(f"Cassette not found: {self.path}")
+            self._archive = zipfile.ZipFile(self.path)
+            index = json.loads(self._archive.read("index.json"))
+            self._recordings = defaultdict(deque)
+            for entry in index["interactions"]:
+                self._recordings[entry["key"]].append(entry)
+
+    # -- record -------------------------------------------------------------
+
+    def _add(self, request: httpx.Request, response: httpx.Response, elapsed: float, body_path: Path):
+        with self._lock:
+            n = len(self._interactions)
+            name = f"bodies/{n:06d}.bin"
+            final_path = self._body_dir / f"{n:06d}.bin"
+            body_path.replace(final_path)
+            self._interactions.append({
+                "key": _request_key(request),
+                "method": request.method,
+                "url": str(request.url),
+                "status_code": response.status_code,
+                "headers": response.headers.multi_items(),
+                "elapsed": round(elapsed, 4),
+                "body": name,
+            })
+
+    def _body_path(self) -> Path:
+        fd, path = tempfile.mkstemp(dir=self._body_dir, suffix=".part")
+        os.close(fd)
+        return Path(path)
+
+    def record(self, request: httpx.Request, response: httpx.Response, elapsed: float) -> httpx.Response:
+        """Return a response whose body is teed to disk as the caller reads it.
+
+        The interaction is added once the body has been read completely, or
+        when the response is closed without reading it.
+        """
+        stream_cls = _AsyncRecordingStream if isinstance(response.stream, httpx.AsyncByteStream) else _RecordingStream
+        stream = stream_cls(response.stream, self._body_path(),
+                            lambda path: self._add(request, response, elapsed, path))
+        return httpx.Response(response.status_code, headers=response.headers, stream=stream,
+                              request=request, extensions=response.extensions)
+
+    def save(self):
+        """Write the archive. Runs automatically at exit in record mode."""
+        with self._lock:
+            if self.mode != "record" or self._saved:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.path.with_name(f"{self.path.name}.part")
+            with zipfile.ZipFile(temp_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+                archive.writestr("index.json", json.dumps({"version": 1, "interactions": self._interactions}))
+                for entry in self._interactions:
+                    archive.write(self._body_dir / Path(entry["body"]).name, entry["body"])
+            temp_path.replace(self.path)
+            shutil.rmtree(self._body_dir, ignore_errors=True)
+            self._saved = True
+            print(f"Cassette: recorded {len(self._interactions)} interactions to {self.path}")
+
+    # -- replay -------------------------------------------------------------
+
+    def match(self, request: httpx.Request) -> tuple[dict, bytes]:
+        key = _request_key(request)
+        with self._lock:
+            recordings = self._recordings.get(key)
+            if not recordings:
+                raise CassetteMissError(f"No recorded response for {request.method} {request.url}")
+            entry = recordings.popleft() if len(recordings) > 1 else recordings[0]
+            body = self._archive.read(entry["body"])
+        return entry, body
+
+    def delay(self, entry: dict) -> float:
+        if self.latency == "recorded":
+            return entry["elapsed"]
+        return float(self.latency or 0)
+
+    def replay_response(self, request: httpx.Request, entry: dict, stream) -> httpx.Response:
+        return httpx.Response(entry["status_code"], headers=entry["headers"], stream=stream, request=request)
+
+
+class _RecordingTee:
+    """Body file shared by the sync and async recording streams.
+
+    The interaction is recorded once, either when the body has been read to
+    the end or when the response is closed without being read (HEAD, 304,
+    raise_for_status before reading); close() reads whatever is left first.
+    """
+
+    def __init__(self, stream, path: Path, on_complete):
+        self._stream = stream
+        self._path = path
+        self._on_complete = on_complete
+        self._file = None
+        self._done = False
+
+    def _write(self, chunk: bytes):
+        if self._file is None:
+            self._file = open(self._path, "wb")
+        self._file.write(chunk)
+
+    def _finish(self):
+        if self._done:
+            return
+        self._done = True
+        if self._file is not None:
+            self._file.close()
+        self._on_complete(self._path)
+
+
+class _RecordingStream(_RecordingTee, httpx.SyncByteStream):
+    def __iter__(self):
+        for chunk in self._stream:
+            self._write(chunk)
+            yield chunk
+        self._finish()
+
+    def close(self):
+        try:
+            if not self._done:
+                for chunk in self._stream:
+                    self._write(chunk)
+                self._finish()
+        except httpx.TransportError:
+            pass  # The body is incomplete, so the interaction isn't recorded
+        finally:
+            self._stream.close()
+
+
+class _AsyncRecordingStream(_RecordingTee, httpx.AsyncByteStream):
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            self._write(chunk)
+            yield chunk
+        self._finish()
+
+    async def aclose(self):
+        try:
+            if not self._done:
+                async for chunk in self._stream:
+                    self._write(chunk)
+                self._finish()
+        except httpx.TransportError:
+            pass  # The body is incomplete, so the interaction isn't recorded
+        finally:
+            await self._stream.aclose()
+
+
+class _ReplayStream(httpx.SyncByteStream):
+    def __init__(self, body: bytes, bandwidth: Optional[float]):
+        self._body = body
+        self._bandwidth = bandwidth
+
+    def __iter__(self):
+        for start in range(0, len(self._body), REPLAY_CHUNK_SIZE):
+            chunk = self._body[start:start + REPLAY_CHUNK_SIZE]
+            if self._bandwidth:
+                time.sleep(len(chunk) / self._bandwidth)
+            yield chunk
+
+
+class _AsyncReplayStream(httpx.AsyncByteStream):
+    def __init__(self, body: bytes, bandwidth: Optional[float]):
+        self._body = body
+        self._bandwidth = bandwidth
+
+    async def __aiter__(self):
+        for start in range(0, len(self._body), REPLAY_CHUNK_SIZE):
+            chunk = self._body[start:start + REPLAY_CHUNK_SIZE]
+            if self._bandwidth:
+                await asyncio.sleep(len(chunk) / self._bandwidth)
+            yield chunk
+
+
+class CassetteTransport(httpx.BaseTransport):
+    """Sync transport that records through `transport` or replays from the cassette."""
+
+    def __init__(self, cassette: Cassette, transport: Optional[httpx.BaseTransport] = None):
+        self.cassette = cassette
+        self.transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        request.read()
+
+        if self.cassette.mode == "replay":
+            entry, body = self.cassette.match(request)
+            delay = self.cassette.delay(entry)
+            if delay:
+                time.sleep(delay)
+            return self.cassette.replay_response(request, entry, _ReplayStream(body, self.cassette.bandwidth))
+
+        start = time.time()
+        response = self.transport.handle_request(request)
+        return self.cassette.record(request, response, time.time() - start)
+
+    def close(self):
+        if self.transport:
+            self.transport.close()
+
+
+class AsyncCassetteTransport(httpx.AsyncBaseTransport):
+    """Async counterpart of CassetteTransport."""
+
+    def __init__(self, cassette: Cassette, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.cassette = cassette
+        self.transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+
+        if self.cassette.mode == "replay":
+            entry, body = self.cassette.match(request)
+            delay = self.cassette.delay(entry)
+            if delay:
+                await asyncio.sleep(delay)
+            return self.cassette.replay_response(request, entry, _AsyncReplayStream(body, self.cassette.bandwidth))
+
+        start = time.time()
+        response = await self.transport.handle_async_request(request)
+        return self.cassette.record(request, response, time.time() - start)
+
+    async def aclose(self):
+        if self.transport:
+            await self.transport.aclose()
@@ -52,7 +52,13 @@ def _append_csv(filename: str, row: dict, fieldnames: list):
         writer.writerow(row)
 
 
-def log_http_request(method, url, status_code, duration_ms=None, error=None, **kwargs):
+def _blank_if_none(value):
+    return "" if value is None else value
+
+
+def log_http_request(method, url, status_code, duration_ms=None, error=None, attempt=1,
+                     connect_ms=None, tls_ms=None, ttfb_ms=None, transfer_ms=None,
+                     bytes_received=None, throughput_kbps=None, connection_reused=None, **kwargs):
     _append_csv("http_requests.csv", {
         "timestamp": datetime.now().isoformat(),
         "run_id": os.environ.get('RUN_ID', 'unknown'),
@@ -60,20 +66,35 @@ def log_http_request(method, url, status_code, duration_ms=None, error=None, **k
         "url": url,
         "status": status_code,
         "duration_ms": duration_ms,
+        "attempt": attempt,
+        "connect_ms": _blank_if_none(connect_ms),
+        "tls_ms": _blank_if_none(tls_ms),
+        "ttfb_ms": _blank_if_none(ttfb_ms),
+        "transfer_ms": _blank_if_none(transfer_ms),
+        "bytes_received": _blank_if_none(bytes_received),
+        "throughput_kbps": _blank_if_none(throughput_kbps),
+        "connection_reused": _blank_if_none(connection_reused),
         "error": error or ""
-    }, ["timestamp", "run_id", "method", "url", "status", "duration_ms", "error"])
+    }, ["timestamp", "run_id", "method", "url", "status", "duration_ms", "attempt",
+        "connect_ms", "tls_ms", "ttfb_ms", "transfer_ms", "bytes_received", "throughput_kbps",
+        "connection_reused", "error"])
 
 
-def log_data_output(dataset_name, row_count, size_bytes, columns=None, null_counts=None, **kwargs):
+def log_data_output(dataset_name, row_count, size_bytes, columns=None, null_counts=None,
+                    rows_inserted=None, rows_updated=None, total_rows=None, **kwargs):
     _append_csv("data_outputs.csv", {
         "timestamp": datetime.now().isoformat(),
         "run_id": os.environ.get('RUN_ID', 'unknown'),
         "dataset": dataset_name,
         "rows": row_count,
         "size_bytes": size_bytes,
+        "rows_inserted": _blank_if_none(rows_inserted),
+        "rows_updated": _blank_if_none(rows_updated),
+        "total_rows": _blank_if_none(total_rows),
         "columns": ",".join(columns) if columns else "",
         "null_counts": str(null_counts) if null_counts else ""
-    }, ["timestamp", "run_id", "dataset", "rows", "size_bytes", "columns", "null_counts"])
+    }, ["timestamp", "run_id", "dataset", "rows", "size_bytes", "rows_inserted", "rows_updated",
+        "total_rows", "columns", "null_counts"])
 
 
 def log_run_start():
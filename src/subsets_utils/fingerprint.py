@@ -0,0 +1,231 @@
+"""Order-independent content fingerprints for Arrow tables.
+
+Every value is hashed to 64 bits and the hashes are summed per column
+(mod 2**64), so a column's hash doesn't depend on row order, and the
+fingerprint of an appended table is the sum of the fingerprints of its
+parts. Each row's value hashes are also mixed into one row hash and those
+are summed too, so values swapped between rows change the fingerprint.
+Fixed-width columns are hashed straight from their Arrow data buffers;
+variable-width columns hash each distinct value once; nested columns
+(lists, structs, maps) hash each row's value.
+
+upload_data stores the fingerprint of the whole table in the custom metadata
+of each write commit, so has_changed only has to read the commit log.
+"""
+
+import hashlib
+import json
+from typing import Optional
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+from deltalake.fs import DeltaStorageHandler
+
+from .r2 import is_cloud_mode, get_storage_options
+
+COMMIT_KEY = "subsets.fingerprint"
+
+# Commits that change table metadata or layout but never its rows
+_DATA_NEUTRAL_OPERATIONS = {
+    "UPDATE TABLE METADATA", "SET TBLPROPERTIES", "OPTIMIZE",
+    "VACUUM START", "VACUUM END", "ADD CONSTRAINT", "DROP CONSTRAINT",
+}
+_HISTORY_DEPTH = 50
+
+_MASK = (1 << 64) - 1
+_NULL_HASH = 0x9E3779B97F4A7C15
+
+
+def _mix(x: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer over a uint64 array."""
+    x = x ^ (x >> np.uint64(30))
+    x = x * np.uint64(0xBF58476D1CE4E5B9)
+    x = x ^ (x >> np.uint64(27))
+    x = x * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def _type_tag(type_: pa.DataType) -> str:
+    """Type name with Arrow's storage variants collapsed, so a column matches
+    the same whether it was written as string, large_string or string_view."""
+    if pa.types.is_string(type_) or pa.types.is_large_string(type_) or pa.types.is_string_view(type_):
+        return "string"
+    if pa.types.is_binary(type_) or pa.types.is_large_binary(type_) or pa.types.is_binary_view(type_):
+        return "binary"
+    if pa.types.is_dictionary(type_):
+        return _type_tag(type_.value_type)
+    return str(type_)
+
+
+def _fixed_width_hashes(chunk: pa.Array) -> np.ndarray:
+    if pa.types.is_boolean(chunk.type):
+        chunk = chunk.cast(pa.uint8())
+    if len(chunk) == 0:
+        return np.zeros(0, dtype=np.uint64)
+
+    width = chunk.type.bit_width // 8
+    raw = np.frombuffer(chunk.buffers()[1], dtype=np.uint8)
+    raw = raw[chunk.offset * width:(chunk.offset + len(chunk)) * width].reshape(len(chunk), width)
+    if width % 8:
+        raw = np.pad(raw, ((0, 0), (0, 8 - width % 8)))
+    lanes = np.ascontiguousarray(raw).view("<u8")
+
+    hashes = _mix(lanes[:, 0])
+    for lane in range(1, lanes.shape[1]):
+        hashes = _mix(hashes ^ lanes[:, lane])
+    return hashes
+
+
+def _hash_value(value) -> int:
+    if isinstance(value, str):
+        data = value.encode("utf-8")
+    elif isinstance(value, bytes):
+        data = value
+    else:
+        data = repr(value).encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+
+def _variable_width_hashes(chunk: pa.Array) -> np.ndarray:
+    """Hash each distinct value once and spread the hashes back over the rows."""
+    encoded = pc.dictionary_encode(chunk)
+    distinct = np.array([_hash_value(v) for v in encoded.dictionary.to_pylist()], dtype=np.uint64)
+    if len(distinct) == 0:
+        return np.zeros(len(chunk), dtype=np.uint64)
+    return distinct[encoded.indices.fill_null(0).to_numpy(zero_copy_only=False)]
+
+
+def _nested_hashes(chunk: pa.Array) -> np.ndarray:
+    """Per-row hashes of list, struct and map values, which dictionary_encode
+    doesn't support."""
+    return np.array([0 if v is None else _hash_value(v) for v in chunk.to_pylist()], dtype=np.uint64)
+
+
+def _is_fixed_width(type_: pa.DataType) -> bool:
+    return (
+        pa.types.is_boolean(type_) or pa.types.is_integer(type_) or pa.types.is_floating(type_)
+        or pa.types.is_temporal(type_) or pa.types.is_decimal(type_)
+    )
+
+
+def _value_hashes(column: pa.ChunkedArray) -> np.ndarray:
+    """64-bit hash of every value in a column, nulls included."""
+    if pa.types.is_dictionary(column.type):
+        column = column.cast(column.type.value_type)
+    if pa.types.is_string_view(column.type):
+        column = column.cast(pa.large_string())
+    if pa.types.is_binary_view(column.type):
+        column = column.cast(pa.large_binary())
+
+    if _is_fixed_width(column.type):
+        hash_chunk = _fixed_width_hashes
+    elif pa.types.is_nested(column.type):
+        hash_chunk = _nested_hashes
+    else:
+        hash_chunk = _variable_width_hashes
+
+    parts = []
+    for chunk in column.chunks:
+        hashes = hash_chunk(chunk)
+        if chunk.null_count:
+            valid = chunk.is_valid().to_numpy(zero_copy_only=False)
+            hashes = np.where(valid, hashes, np.uint64(_NULL_HASH))
+        parts.append(hashes)
+    return np.concatenate(parts) if parts else np.zeros(0, dtype=np.uint64)
+
+
+def column_hash(column: pa.ChunkedArray) -> int:
+    """Order-independent 64-bit hash of a column's values (nulls included)."""
+    return int(_value_hashes(column).sum(dtype=np.uint64))
+
+
+def table_fingerprint(table: pa.Table) -> dict:
+    """Fingerprint of a table: row count, column types, per-column hashes and
+    a row hash.
+
+    The row hash combines each row's values into one hash and sums those, so
+    it catches values moving between rows (which leaves every column's sum
+    unchanged) while still not depending on row order.
+    """
+    columns = {}
+    row_hashes = np.zeros(table.num_rows, dtype=np.uint64)
+    for name in sorted(table.column_names):
+        hashes = _value_hashes(table[name])
+        columns[name] = f"{int(hashes.sum(dtype=np.uint64)):016x}"
+        row_hashes = _mix(row_hashes ^ (hashes + np.uint64(_hash_value(name))))
+    return {
+        "rows": table.num_rows,
+        "types": {field.name: _type_tag(field.type) for field in table.schema},
+        "columns": {name: columns[name] for name in table.column_names},
+        "row_hash": f"{int(row_hashes.sum(dtype=np.uint64)):016x}",
+    }
+
+
+def combine(existing: dict, appended: dict) -> dict:
+    """Fingerprint of `existing` with the rows of `appended` added to it.
+
+    Columns present on only one side are null for the other side's rows,
+    matching how an append with schema_mode='merge' fills them. That changes
+    the existing rows' row hashes, so the combined row hash is only known
+    when both sides have the same columns (None otherwise).
+    """
+    columns = {}
+    for name in {**existing["columns"], **appended["columns"]}:
+        total = 0
+        for part in (existing, appended):
+            if name in part["columns"]:
+                total += int(part["columns"][name], 16)
+            else:
+                total += part["rows"] * _NULL_HASH
+        columns[name] = f"{total & _MASK:016x}"
+
+    row_hash = None
+    if existing.get("row_hash") and appended.get("row_hash") and existing["columns"].keys() == appended["columns"].keys():
+        row_hash = f"{(int(existing['row_hash'], 16) + int(appended['row_hash'], 16)) & _MASK:016x}"
+    return {
+        "rows": existing["rows"] + appended["rows"],
+        "types": {**existing["types"], **appended["types"]},
+        "columns": columns,
+        "row_hash": row_hash,
+    }
+
+
+def _commit_info(handler: DeltaStorageHandler, version: int) -> Optional[dict]:
+    """commitInfo action of one commit file, or None if the file is gone."""
+    try:
+        with handler.open_input_file(f"_delta_log/{version:020d}.json") as f:
+            lines = f.read().decode("utf-8").splitlines()
+    except FileNotFoundError:
+        return None
+    for line in lines:
+        action = json.loads(line) if line.strip() else {}
+        if "commitInfo" in action:
+            return action["commitInfo"]
+    return {}
+
+
+def stored_fingerprint(dt) -> Optional[dict]:
+    """The fingerprint recorded with the table's latest data-changing commit.
+
+    Reads the latest commit file and walks back one commit at a time only
+    past data-neutral ones (metadata updates, optimize, vacuum), so usually a
+    single small read.
+
+    Returns None when that commit has none (e.g. a merge, or a table written
+    before fingerprints were recorded).
+    """
+    handler = DeltaStorageHandler(dt.table_uri, get_storage_options() if is_cloud_mode() else None)
+    version = dt.version()
+    for _ in range(_HISTORY_DEPTH):
+        if version < 0:
+            return None
+        commit = _commit_info(handler, version)
+        if commit is None:
+            return None
+        if COMMIT_KEY in commit:
+            return json.loads(commit[COMMIT_KEY])
+        if commit.get("operation") not in _DATA_NEUTRAL_OPERATIONS:
+            return None
+        version -= 1
+    return None
@@ -1,156 +1,938 @@
 import os
 import json
+import atexit
+import asyncio
+import gzip
 import hashlib
+import sqlite3
 import httpx
+from urllib.parse import urlencode
 import time
+import uuid
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager, ExitStack
+from email.utils import parsedate_to_datetime
 from pathlib import Path
-from typing import Optional, Dict, Union
-from datetime import datetime
+from typing import Optional, Dict, Union, Iterator
+from datetime import datetime, timezone
+from tenacity import Retrying, AsyncRetrying, stop_after_attempt, retry_if_exception_type, wait_exponential_jitter
 from . import debug
+from .cassette import Cassette, CassetteTransport, AsyncCassetteTransport
 
-_client = None
+# Sync clients keyed by host (None = the shared client); guarded by _client_lock
+_clients = {}
+_retired_clients = []
+_client_lock = threading.RLock()
+_cache_manager = None
+_cache_inflight = None
+_async_client = None
+_async_client_loop = None
+_cassette = None
 _client_config = {
     'timeout': int(os.environ.get('HTTP_TIMEOUT', '30')),
+    'http2': os.environ.get('HTTP2', 'true').lower() == 'true',
+    'max_connections': int(os.environ.get('HTTP_MAX_CONNECTIONS', '100')),
+    'max_keepalive_connections': int(os.environ.get('HTTP_MAX_KEEPALIVE_CONNECTIONS', '20')),
+    # Seconds an idle pooled connection is kept open for reuse
+    'keepalive_expiry': float(os.environ.get('HTTP_KEEPALIVE_EXPIRY', '30')),
+    # Give every host its own client and connection pool, so one slow host
+    # can't exhaust the connections another needs
+    'per_host_clients': os.environ.get('HTTP_PER_HOST_CLIENTS', '').lower() == 'true',
     'cache_enabled': os.environ.get('ENABLE_HTTP_CACHE', '').lower() == 'true',
     'cache_dir': Path(os.environ.get('HTTP_CACHE_DIR', 'http_cache')),
-    'headers': {'User-Agent': os.environ.get('HTTP_USER_AGENT', 'DataIntegrations/1.0')}
+    # Fallback lifetime (seconds) for responses without Cache-Control/Expires;
+    # unset keeps such entries until evicted
+    'cache_ttl': float(os.environ['HTTP_CACHE_TTL']) if os.environ.get('HTTP_CACHE_TTL') else None,
+    'cache_max_bytes': int(os.environ['HTTP_CACHE_MAX_BYTES']) if os.environ.get('HTTP_CACHE_MAX_BYTES') else None,
+    # Body compression for cache entries: 'zstd' (needs zstandard), 'gzip' or 'none'
+    'cache_codec': os.environ.get('HTTP_CACHE_CODEC', 'zstd'),
+    'cache_compression_level': int(os.environ['HTTP_CACHE_COMPRESSION_LEVEL']) if os.environ.get('HTTP_CACHE_COMPRESSION_LEVEL') else None,
+    # Request headers that select a different cached response (part of the cache key)
+    'cache_vary_headers': tuple(
+        h.strip().lower() for h in os.environ.get('HTTP_CACHE_VARY_HEADERS', 'accept,accept-language,authorization').split(',') if h.strip()
+    ),
+    'headers': {'User-Agent': os.environ.get('HTTP_USER_AGENT', 'DataIntegrations/1.0')},
+    # Record/replay: set cassette to an archive path to record a run's traffic
+    # or replay it offline (see cassette.py)
+    'cassette': os.environ.get('HTTP_CASSETTE') or None,
+    'cassette_mode': os.environ.get('HTTP_CASSETTE_MODE', 'replay'),
+    'cassette_latency': os.environ.get('HTTP_CASSETTE_LATENCY') or None,
+    'cassette_bandwidth': float(os.environ['HTTP_CASSETTE_BANDWIDTH']) if os.environ.get('HTTP_CASSETTE_BANDWIDTH') else None,
+    # Retry policy: an attempt is retried on a retry_statuses response or a
+    # retry_exceptions error, for retry_methods only (POST is not idempotent
+    # by default; opt in per connector via configure_http)
+    'retry_attempts': int(os.environ.get('HTTP_RETRY_ATTEMPTS', '3')),
+    'retry_statuses': {429, 500, 502, 503, 504},
+    'retry_exceptions': (httpx.TransportError,),
+    'retry_methods': {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'},
+    'retry_backoff': float(os.environ.get('HTTP_RETRY_BACKOFF', '1.0')),
+    'retry_max_backoff': float(os.environ.get('HTTP_RETRY_MAX_BACKOFF', '60')),
+    # Rate limits in requests/second: rate_limit applies to every host,
+    # rate_limits overrides it per host (e.g. {'api.example.com': 5})
+    'rate_limit': float(os.environ['HTTP_RATE_LIMIT']) if os.environ.get('HTTP_RATE_LIMIT') else None,
+    'rate_limits': {},
+    'rate_limit_burst': int(os.environ.get('HTTP_RATE_LIMIT_BURST', '1')),
 }
 
+
+class _RetryableStatus(Exception):
+    """Raised for a response whose status code should be retried."""
+
+    def __init__(self, response: httpx.Response):
+        super().__init__(f"HTTP {response.status_code}")
+        self.response = response
+
+
+def _retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP-date)."""
+    value = response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def _wait_for_retry(retry_state) -> float:
+    """Jittered exponential backoff, deferring to Retry-After when the server sends one."""
+    exc = retry_state.outcome.exception()
+    if isinstance(exc, _RetryableStatus):
+        retry_after = _retry_after_seconds(exc.response)
+        if retry_after is not None:
+            return min(retry_after, _client_config['retry_max_backoff'])
+    backoff = wait_exponential_jitter(
+        initial=_client_config['retry_backoff'],
+        max=_client_config['retry_max_backoff']
+    )
+    return backoff(retry_state)
+
+
+def _retry_kwargs(method: str) -> dict:
+    attempts = _client_config['retry_attempts'] if method.upper() in _client_config['retry_methods'] else 1
+    return dict(
+        stop=stop_after_attempt(max(1, attempts)),
+        wait=_wait_for_retry,
+        retry=retry_if_exception_type((_RetryableStatus, *_client_config['retry_exceptions'])),
+        reraise=True,
+    )
+
+
+def _check_retryable(response: httpx.Response, retry_state) -> None:
+    """Raise _RetryableStatus unless this is the final attempt.
+
+    On the final attempt the response is handed back to the caller unchanged,
+    so raise_for_status() behaves exactly as it would without retries.
+    """
+    if response.status_code not in _client_config['retry_statuses']:
+        return
+    if retry_state.attempt_number >= retry_state.retry_object.stop.max_attempt_number:
+        return
+    raise _RetryableStatus(response)
+
+
+class _TokenBucket:
+    """Thread-safe token bucket. acquire() reserves a token and returns how
+    long the caller must wait before using it."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> float:
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+_rate_buckets: Dict[str, _TokenBucket] = {}
+_rate_buckets_lock = threading.Lock()
+
+
+def _rate_limit_delay(host: str) -> float:
+    rate = _client_config['rate_limits'].get(host, _client_config['rate_limit'])
+    if not rate:
+        return 0.0
+    with _rate_buckets_lock:
+        bucket = _rate_buckets.get(host)
+        if bucket is None or bucket.rate != rate:
+            bucket = _rate_buckets[host] = _TokenBucket(rate, _client_config['rate_limit_burst'])
+    return bucket.acquire()
+
+
+def _rate_limit_hook(request: httpx.Request):
+    """httpx request hook: runs only for requests that actually hit the network."""
+    delay = _rate_limit_delay(request.url.host)
+    if delay:
+        time.sleep(delay)
+
+
+async def _arate_limit_hook(request: httpx.Request):
+    delay = _rate_limit_delay(request.url.host)
+    if delay:
+        await asyncio.sleep(delay)
+
+def _freshness_lifetime(response: httpx.Response) -> Optional[float]:
+    """Seconds a response may be served from cache, per Cache-Control/Expires.
+
+    Returns None when the response carries no freshness information, 0 for
+    no-cache (store, but revalidate before every use) and -1 for no-store.
+    """
+    directives = {}
+    for part in response.headers.get("cache-control", "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip('"')
+
+    if "no-store" in directives:
+        return -1
+    if "no-cache" in directives:
+        return 0
+    for name in ("s-maxage", "max-age"):
+        if name in directives:
+            try:
+                return max(0.0, float(directives[name]))
+            except ValueError:
+                return 0
+
+    if expires := response.headers.get("expires"):
+        try:
+            expires_at = parsedate_to_datetime(expires)
+            date = response.headers.get("date")
+            now = parsedate_to_datetime(date) if date else datetime.now(timezone.utc)
+            return max(0.0, (expires_at - now).total_seconds())
+        except (TypeError, ValueError):
+            return 0  # An invalid Expires means already expired
+
+    return None
+
+
+try:
+    import xxhash
+
+    def _digest(data: bytes) -> str:
+        return xxhash.xxh3_128_hexdigest(data)
+except ImportError:
+    def _digest(data: bytes) -> str:
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+def _resolve_codec(codec: str) -> str:
+    """Fall back to gzip when zstd is requested but zstandard isn't installed."""
+    codec = (codec or "none").lower()
+    if codec == "zstd" and zstandard is None:
+        return "gzip"
+    if codec not in ("zstd", "gzip", "none"):
+        raise ValueError(f"Invalid cache codec '{codec}'. Must be 'zstd', 'gzip', or 'none'.")
+    return codec
+
+
+def _compress(data: bytes, codec: str, level: Optional[int]) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=3 if level is None else level).compress(data)
+    if codec == "gzip":
+        return gzip.compress(data, compresslevel=6 if level is None else level)
+    return data
+
+
+def _decompress(data: bytes, codec: Optional[str]) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec == "gzip":
+        return gzip.decompress(data)
+    return data
+
+
+def _canonical_body(kwargs: dict) -> Optional[bytes]:
+    """Deterministic bytes for a request body, or None if it can't be fingerprinted."""
+    if kwargs.get("files") is not None:
+        return None
+    if kwargs.get("json") is not None:
+        return b"json:" + json.dumps(kwargs["json"], sort_keys=True, separators=(",", ":")).encode()
+    data = kwargs.get("data")
+    if data is not None:
+        if isinstance(data, dict):
+            return b"form:" + urlencode(sorted(data.items()), doseq=True).encode()
+        return None
+    content = kwargs.get("content")
+    if content is not None:
+        if isinstance(content, str):
+            return b"content:" + content.encode()
+        if isinstance(content, (bytes, bytearray)):
+            return b"content:" + bytes(content)
+        return None
+    return b""
+
+
 class CacheManager:
-    def __init__(self, cache_dir: Path):
+    """On-disk HTTP cache with per-entry freshness and LRU eviction.
+
+    Metadata for every entry (status, headers, size, expires_at, last_access)
+    lives in one SQLite index at {cache_dir}/index.sqlite; bodies are stored
+    as {cache_dir}/{key[:2]}/{key}.bin so no directory grows too large. A
+    lookup is one primary-key query plus one file open.
+
+    Bodies are compressed with the configured codec (zstd or gzip) and stored
+    raw when that doesn't make them smaller; the codec is recorded per entry.
+    max_bytes budgets the compressed, on-disk size.
+
+    Entries past expires_at are stale: they are only served after a
+    successful revalidation. last_access gives the LRU order used when the
+    cache exceeds max_bytes.
+    """
+
+    def __init__(self, cache_dir: Path, default_ttl: Optional[float] = None, max_bytes: Optional[int] = None,
+                 vary_headers: tuple = (), codec: str = "none", compression_level: Optional[int] = None):
         self.cache_dir = cache_dir
         self.cache_dir.mkdir(exist_ok=True, parents=True)
-        
-    def _cache_key(self, method: str, url: str, params: Optional[Dict] = None) -> str:
-        key_parts = [method, url]
-        if params:
-            key_parts.append(json.dumps(sorted(params.items())))
-        return hashlib.md5("".join(key_parts).encode()).hexdigest()
-    
-    def get(self, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
-        key = self._cache_key(method, url, kwargs.get("params"))
-        metadata_file = self.cache_dir / f"{key}.meta.json"
-        content_file = self.cache_dir / f"{key}.bin"
-        
-        if metadata_file.exists() and content_file.exists():
-            # Load metadata
-            with open(metadata_file, 'r') as f:
-                metadata = json.load(f)
-            
-            # Load raw content bytes
-            with open(content_file, 'rb') as f:
-                content = f.read()
-            
-            # Get headers and remove encoding-related ones since content is raw
-            headers = metadata.get("headers", {})
-            headers.pop("content-encoding", None)
-            headers.pop("transfer-encoding", None)
-
-            return httpx.Response(
-                status_code=metadata["status_code"],
-                headers=headers,
-                content=content,
-                request=httpx.Request(method, url)
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self.vary_headers = tuple(h.lower() for h in vary_headers)
+        self.codec = _resolve_codec(codec)
+        self.compression_level = compression_level
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.cache_dir / "index.sqlite", check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                method TEXT NOT NULL,
+                url TEXT NOT NULL,
+                status_code INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                cached_at TEXT NOT NULL,
+                expires_at REAL,
+                last_access REAL NOT NULL,
+                codec TEXT,
+                stored_size INTEGER
             )
-        
+        """)
+        # Indexes created before compression support lack the codec columns
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(entries)")}
+        if "codec" not in columns:
+            self._db.execute("ALTER TABLE entries ADD COLUMN codec TEXT")
+            self._db.execute("ALTER TABLE entries ADD COLUMN stored_size INTEGER")
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)")
+
+    def _cache_key(self, method: str, url: str, **kwargs) -> Optional[str]:
+        """Canonical key over method, URL with sorted query, vary headers and body.
+
+        Returns None for requests whose body can't be fingerprinted (streams,
+        file uploads); those bypass the cache.
+        """
+        body = _canonical_body(kwargs)
+        if body is None:
+            return None
+
+        request_url = httpx.URL(url)
+        if kwargs.get("params") is not None:
+            request_url = request_url.copy_merge_params(kwargs["params"])
+        query = sorted(request_url.params.multi_items())
+
+        headers = httpx.Headers(_client_config['headers'])
+        headers.update(kwargs.get("headers") or {})
+        vary = [(name, headers.get(name, "")) for name in sorted(self.vary_headers)]
+
+        key_parts = [
+            method.upper().encode(),
+            str(request_url.copy_with(query=None)).encode(),
+            json.dumps(query).encode(),
+            json.dumps(vary).encode(),
+            _digest(body).encode(),
+        ]
+        return _digest(b"\x1f".join(key_parts))
+
+    def _content_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.bin"
+
+    def lookup(self, method: str, url: str, **kwargs) -> Optional[tuple[httpx.Response, bool]]:
+        """Return (response, is_fresh) for a cached entry, or None on a miss."""
+        key = self._cache_key(method, url, **kwargs)
+        if key is None:
+            return None
+
+        with self._lock:
+            row = self._db.execute(
+                "SELECT status_code, headers, expires_at, codec FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            # Mark as recently used for LRU eviction
+            self._db.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+
+        status_code, headers_json, expires_at, codec = row
+        if codec == "zstd" and zstandard is None:
+            return None  # Written by an environment with zstandard installed
+        try:
+            with open(self._content_path(key), 'rb') as f:
+                content = _decompress(f.read(), codec)
+        except FileNotFoundError:
+            # Body removed behind the index's back; treat as a miss
+            self._delete(key)
+            return None
+
+        # Get headers and remove encoding-related ones since content is raw
+        headers = json.loads(headers_json)
+        headers.pop("content-encoding", None)
+        headers.pop("transfer-encoding", None)
+
+        is_fresh = expires_at is None or time.time() < expires_at
+
+        response = httpx.Response(
+            status_code=status_code,
+            headers=headers,
+            content=content,
+            request=httpx.Request(method, url)
+        )
+        return response, is_fresh
+
+    def get(self, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        """Return a fresh cached response, or None if missing or stale."""
+        cached = self.lookup(method, url, **kwargs)
+        if cached and cached[1]:
+            return cached[0]
         return None
-    
-    def save(self, method: str, url: str, response: httpx.Response, **kwargs):
-        key = self._cache_key(method, url, kwargs.get("params"))
-        metadata_file = self.cache_dir / f"{key}.meta.json"
-        content_file = self.cache_dir / f"{key}.bin"
-        
-        # Save raw content bytes
-        with open(content_file, 'wb') as f:
-            f.write(response.content)
-        
-        # Save metadata
-        metadata = {
-            "status_code": response.status_code,
-            "headers": dict(response.headers),
-            "url": url,
-            "method": method,
-            "cached_at": datetime.now().isoformat()
+
+    def _expires_at(self, response: httpx.Response, ttl: Optional[float]) -> Optional[float]:
+        if ttl is None:
+            ttl = _freshness_lifetime(response)
+        if ttl is None:
+            ttl = self.default_ttl
+        return None if ttl is None else time.time() + ttl
+
+    def save(self, method: str, url: str, response: httpx.Response, ttl: Optional[float] = None, **kwargs):
+        """Store a response. ttl overrides the lifetime derived from its headers."""
+        if ttl is None and _freshness_lifetime(response) == -1:
+            return  # Cache-Control: no-store
+
+        key = self._cache_key(method, url, **kwargs)
+        if key is None:
+            return
+        content_file = self._content_path(key)
+        content_file.parent.mkdir(exist_ok=True)
+
+        codec = self.codec
+        stored = _compress(response.content, codec, self.compression_level)
+        if len(stored) >= len(response.content):
+            codec, stored = "none", response.content
+
+        # Save body via a temp file so readers never see a partial write
+        temp_file = content_file.with_name(f"{content_file.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            with open(temp_file, 'wb') as f:
+                f.write(stored)
+            os.replace(temp_file, content_file)
+        finally:
+            temp_file.unlink(missing_ok=True)
+
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key, method, url, response.status_code, json.dumps(dict(response.headers)),
+                    len(response.content), datetime.now().isoformat(),
+                    self._expires_at(response, ttl), time.time(), codec, len(stored)
+                )
+            )
+
+        if self.max_bytes is not None:
+            self._evict()
+
+    def refresh(self, method: str, url: str, not_modified: httpx.Response, ttl: Optional[float] = None, **kwargs):
+        """Extend a stale entry's lifetime after a 304 revalidation."""
+        key = self._cache_key(method, url, **kwargs)
+        if key is None:
+            return
+
+        with self._lock:
+            row = self._db.execute("SELECT headers FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return
+
+            # A 304 may carry updated validators and freshness headers
+            headers = json.loads(row[0])
+            headers.update({
+                name: value for name, value in not_modified.headers.items()
+                if name in ("etag", "last-modified", "cache-control", "expires", "date")
+            })
+            merged = httpx.Response(200, headers=headers)
+
+            self._db.execute(
+                "UPDATE entries SET headers = ?, expires_at = ?, cached_at = ?, last_access = ? WHERE key = ?",
+                (json.dumps(headers), self._expires_at(merged, ttl), datetime.now().isoformat(), time.time(), key)
+            )
+
+    def stats(self) -> dict:
+        """Entry count, raw vs on-disk bytes, compression ratio and bytes saved."""
+        with self._lock:
+            entries, raw_bytes, stored_bytes = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(COALESCE(stored_size, size)), 0) FROM entries"
+            ).fetchone()
+        return {
+            "entries": entries,
+            "codec": self.codec,
+            "raw_bytes": raw_bytes,
+            "stored_bytes": stored_bytes,
+            "bytes_saved": raw_bytes - stored_bytes,
+            "compression_ratio": round(raw_bytes / stored_bytes, 2) if stored_bytes else None,
         }
-        
-        with open(metadata_file, 'w') as f:
-            json.dump(metadata, f, indent=2)
+
+    def _delete(self, key: str):
+        with self._lock:
+            self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+        self._content_path(key).unlink(missing_ok=True)
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes."""
+        with self._lock:
+            total = self._db.execute("SELECT COALESCE(SUM(COALESCE(stored_size, size)), 0) FROM entries").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+
+            victims = []
+            for key, size in self._db.execute("SELECT key, COALESCE(stored_size, size) FROM entries ORDER BY last_access"):
+                if total <= self.max_bytes:
+                    break
+                victims.append(key)
+                total -= size
+
+            self._db.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key in victims])
+
+        for key in victims:
+            self._content_path(key).unlink(missing_ok=True)
+
+
+def _revalidation_kwargs(cached: httpx.Response, kwargs: dict) -> Optional[dict]:
+    """Request kwargs for revalidating a stale entry, or None if it has no validators."""
+    validation_headers = conditional_headers(response_validators(cached))
+    if not validation_headers:
+        return None
+    return {**kwargs, "headers": {**(kwargs.get("headers") or {}), **validation_headers}}
+
+
+class _SingleFlight:
+    """Coalesce concurrent calls with the same key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it
+    is in flight block and receive the same result (or exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+
+    def do(self, key: str, fn):
+        with self._lock:
+            future = self._calls.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = self._calls[key] = Future()
+
+        if not is_leader:
+            return future.result()
+
+        try:
+            result = fn()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+class _AsyncSingleFlight:
+    """Event-loop counterpart of _SingleFlight.
+
+    The call runs as its own task and every caller awaits it through
+    asyncio.shield, so cancelling one caller (the first included) leaves the
+    shared request and the other waiters running.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+
+    async def do(self, key: str, fn):
+        task = self._calls.get(key)
+        if task is None:
+            task = self._calls[key] = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda t: self._finish(key, t))
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the exception retrieved in case every caller was cancelled
+        if not task.cancelled():
+            task.exception()
 
 
 class CachedClient:
-    def __init__(self, client: httpx.Client, cache_manager: CacheManager):
+    def __init__(self, client: httpx.Client, cache_manager: CacheManager, inflight: Optional[_SingleFlight] = None):
         self.client = client
         self.cache = cache_manager
-        
-    def request(self, method: str, url: str, **kwargs) -> httpx.Response:
-        if _client_config['cache_enabled']:
-            cached_response = self.cache.get(method, url, **kwargs)
-            if cached_response:
+        self._inflight = inflight or _SingleFlight()
+
+    def request(self, method: str, url: str, cache_ttl: Optional[float] = None, **kwargs) -> httpx.Response:
+        """Serve fresh entries from cache, revalidate stale ones, fetch the rest.
+
+        Concurrent identical requests (same cache key) share a single network
+        call and cache write, and all receive the same response object.
+        cache_ttl (seconds) overrides the freshness lifetime from response headers.
+        """
+        key = self.cache._cache_key(method, url, **kwargs) if _client_config['cache_enabled'] else None
+        if key is None:
+            return self.client.request(method, url, **kwargs)
+        return self._inflight.do(key, lambda: self._request(method, url, cache_ttl, **kwargs))
+
+    def _request(self, method: str, url: str, cache_ttl: Optional[float], **kwargs) -> httpx.Response:
+        cached = self.cache.lookup(method, url, **kwargs)
+        if cached:
+            cached_response, is_fresh = cached
+            if is_fresh:
                 return cached_response
 
+            revalidation_kwargs = _revalidation_kwargs(cached_response, kwargs)
+            if revalidation_kwargs:
+                response = self.client.request(method, url, **revalidation_kwargs)
+                if response.status_code == 304:
+                    self.cache.refresh(method, url, response, ttl=cache_ttl, **kwargs)
+                    return cached_response
+                if 200 <= response.status_code < 300:
+                    self.cache.save(method, url, response, ttl=cache_ttl, **kwargs)
+                return response
+
         response = self.client.request(method, url, **kwargs)
 
-        if _client_config['cache_enabled'] and response.status_code < 400:
-            self.cache.save(method, url, response, **kwargs)
+        # Only cache complete 2xx bodies; a 304 has no content to replay
+        if 200 <= response.status_code < 300:
+            self.cache.save(method, url, response, ttl=cache_ttl, **kwargs)
 
         return response
-    
+
     def get(self, url: str, **kwargs) -> httpx.Response:
         return self.request("GET", url, **kwargs)
-    
+
     def post(self, url: str, **kwargs) -> httpx.Response:
         return self.request("POST", url, **kwargs)
-    
+
     def put(self, url: str, **kwargs) -> httpx.Response:
         return self.request("PUT", url, **kwargs)
-    
+
     def delete(self, url: str, **kwargs) -> httpx.Response:
         return self.request("DELETE", url, **kwargs)
-    
+
     def close(self):
         self.client.close()
 
+
+class AsyncCachedClient:
+    """Async counterpart of CachedClient, sharing the same on-disk CacheManager."""
+
+    def __init__(self, client: httpx.AsyncClient, cache_manager: CacheManager):
+        self.client = client
+        self.cache = cache_manager
+        self._inflight = _AsyncSingleFlight()
+
+    async def request(self, method: str, url: str, cache_ttl: Optional[float] = None, **kwargs) -> httpx.Response:
+        key = self.cache._cache_key(method, url, **kwargs) if _client_config['cache_enabled'] else None
+        if key is None:
+            return await self.client.request(method, url, **kwargs)
+        return await self._inflight.do(key, lambda: self._request(method, url, cache_ttl, **kwargs))
+
+    async def _request(self, method: str, url: str, cache_ttl: Optional[float], **kwargs) -> httpx.Response:
+        # Cache I/O is blocking file access, so keep it off the event loop
+        cached = await asyncio.to_thread(self.cache.lookup, method, url, **kwargs)
+        if cached:
+            cached_response, is_fresh = cached
+            if is_fresh:
+                return cached_response
+
+            revalidation_kwargs = _revalidation_kwargs(cached_response, kwargs)
+            if revalidation_kwargs:
+                response = await self.client.request(method, url, **revalidation_kwargs)
+                if response.status_code == 304:
+                    await asyncio.to_thread(self.cache.refresh, method, url, response, ttl=cache_ttl, **kwargs)
+                    return cached_response
+                if 200 <= response.status_code < 300:
+                    await asyncio.to_thread(self.cache.save, method, url, response, ttl=cache_ttl, **kwargs)
+                return response
+
+        response = await self.client.request(method, url, **kwargs)
+
+        if 200 <= response.status_code < 300:
+            await asyncio.to_thread(self.cache.save, method, url, response, ttl=cache_ttl, **kwargs)
+
+        return response
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def put(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("PUT", url, **kwargs)
+
+    async def delete(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("DELETE", url, **kwargs)
+
+    async def aclose(self):
+        await self.client.aclose()
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional 'h2' package (pip install httpx[http2])."""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def _create_cache_manager(config: dict) -> CacheManager:
+    return CacheManager(
+        config['cache_dir'],
+        default_ttl=config['cache_ttl'],
+        max_bytes=config['cache_max_bytes'],
+        vary_headers=config['cache_vary_headers'],
+        codec=config['cache_codec'],
+        compression_level=config['cache_compression_level']
+    )
+
+def _get_cassette() -> Optional[Cassette]:
+    global _cassette
+    if not _client_config['cassette']:
+        return None
+    if _cassette is None:
+        latency = _client_config['cassette_latency']
+        if latency not in (None, 'recorded'):
+            latency = float(latency)
+        _cassette = Cassette(
+            _client_config['cassette'],
+            mode=_client_config['cassette_mode'],
+            latency=latency,
+            bandwidth=_client_config['cassette_bandwidth']
+        )
+    return _cassette
+
+def _pool_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=_client_config['max_connections'],
+        max_keepalive_connections=_client_config['max_keepalive_connections'],
+        keepalive_expiry=_client_config['keepalive_expiry']
+    )
+
 def _create_base_client() -> httpx.Client:
+    http2 = _client_config['http2'] and _http2_available()
+    limits = _pool_limits()
+
+    transport = None
+    if cassette := _get_cassette():
+        inner = httpx.HTTPTransport(http2=http2, limits=limits) if cassette.mode == 'record' else None
+        transport = CassetteTransport(cassette, inner)
+
     return httpx.Client(
         timeout=_client_config['timeout'],
         headers=_client_config['headers'],
-        follow_redirects=True
+        follow_redirects=True,
+        event_hooks={'request': [_rate_limit_hook]},
+        http2=http2,
+        limits=limits,
+        transport=transport
     )
 
-def _get_or_create_client(**overrides) -> Union[httpx.Client, CachedClient]:
-    global _client
-    
-    if _client is None:
+def _client_key(url: Optional[str]) -> Optional[str]:
+    if url is None or not _client_config['per_host_clients']:
+        return None
+    return httpx.URL(url).host or None
+
+def _shared_cache(config: dict) -> tuple[CacheManager, _SingleFlight]:
+    """The cache index and in-flight registry shared by every sync client, so
+    identical requests still coalesce when per-host clients are enabled."""
+    global _cache_manager, _cache_inflight
+    if _cache_manager is None:
+        _cache_manager = _create_cache_manager(config)
+        _cache_inflight = _SingleFlight()
+    return _cache_manager, _cache_inflight
+
+def _get_or_create_client(url: Optional[str] = None, **overrides) -> Union[httpx.Client, CachedClient]:
+    """Return the client for url's host (or the shared client).
+
+    Safe to call from many threads: each client is built exactly once and its
+    connection pool is reused by every caller.
+    """
+    key = _client_key(url)
+    client = _clients.get(key)
+    if client is not None:
+        return client
+
+    with _client_lock:
+        client = _clients.get(key)
+        if client is None:
+            config = _client_config.copy()
+            config.update(overrides)
+
+            base_client = _create_base_client()
+
+            if config['cache_enabled']:
+                client = CachedClient(base_client, *_shared_cache(config))
+            else:
+                client = base_client
+            _clients[key] = client
+
+    return client
+
+def _close_clients():
+    with _client_lock:
+        clients = [*_clients.values(), *_retired_clients]
+        _clients.clear()
+        _retired_clients.clear()
+    for client in clients:
+        client.close()
+
+atexit.register(_close_clients)
+
+def _create_base_async_client() -> httpx.AsyncClient:
+    http2 = _client_config['http2'] and _http2_available()
+    limits = _pool_limits()
+
+    transport = None
+    if cassette := _get_cassette():
+        inner = httpx.AsyncHTTPTransport(http2=http2, limits=limits) if cassette.mode == 'record' else None
+        transport = AsyncCassetteTransport(cassette, inner)
+
+    return httpx.AsyncClient(
+        timeout=_client_config['timeout'],
+        headers=_client_config['headers'],
+        follow_redirects=True,
+        event_hooks={'request': [_arate_limit_hook]},
+        http2=http2,
+        limits=limits,
+        transport=transport
+    )
+
+def _get_or_create_async_client(**overrides) -> Union[httpx.AsyncClient, AsyncCachedClient]:
+    """Return the async client for the running event loop.
+
+    An httpx.AsyncClient is bound to the loop it was first used on, so a new
+    client is created whenever the running loop changes (e.g. across
+    separate asyncio.run() calls).
+    """
+    global _async_client, _async_client_loop
+
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_client_loop is not loop:
         config = _client_config.copy()
         config.update(overrides)
-        
-        base_client = _create_base_client()
-        
+
+        base_client = _create_base_async_client()
+
         if config['cache_enabled']:
-            cache_manager = CacheManager(config['cache_dir'])
-            _client = CachedClient(base_client, cache_manager)
+            cache_manager = _create_cache_manager(config)
+            _async_client = AsyncCachedClient(base_client, cache_manager)
         else:
-            _client = base_client
-            
-    return _client
+            _async_client = base_client
+        _async_client_loop = loop
+
+    return _async_client
+
+class _RequestTimer:
+    """Per-attempt timing breakdown collected from httpcore trace events.
+
+    Passed as the 'trace' request extension; httpcore reports connect, TLS,
+    send and receive phases, which gives connect/TLS time, time to first byte
+    (from request start to response headers), body transfer time and whether
+    an existing pooled connection was reused.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.events = {}
+
+    def __call__(self, name: str, info: dict):
+        # Names look like 'connection.connect_tcp.started' or
+        # 'http11.receive_response_body.complete'; drop the layer prefix
+        self.events[name.split('.', 1)[-1]] = time.perf_counter()
+
+    async def atrace(self, name: str, info: dict):
+        self(name, info)
+
+    def _span_ms(self, step: str) -> Optional[float]:
+        started = self.events.get(f"{step}.started")
+        completed = self.events.get(f"{step}.complete")
+        if started is None or completed is None:
+            return None
+        return round((completed - started) * 1000, 1)
+
+    def breakdown(self, response: Optional[httpx.Response] = None) -> dict:
+        headers_done = self.events.get("receive_response_headers.complete")
+        body_done = self.events.get("receive_response_body.complete")
+        transfer_s = body_done - headers_done if headers_done is not None and body_done is not None else None
+        bytes_received = response.num_bytes_downloaded if response is not None and self.events else None
+
+        return {
+            "connect_ms": self._span_ms("connect_tcp"),
+            "tls_ms": self._span_ms("start_tls"),
+            "ttfb_ms": round((headers_done - self.start) * 1000, 1) if headers_done is not None else None,
+            "transfer_ms": round(transfer_s * 1000, 1) if transfer_s is not None else None,
+            "bytes_received": bytes_received,
+            "throughput_kbps": round(bytes_received / 1024 / transfer_s, 1) if transfer_s and bytes_received else None,
+            # No trace events at all means the response never hit the network (cache hit/replay)
+            "connection_reused": ("connect_tcp.started" not in self.events) if self.events else None,
+        }
+
+
+def _with_trace(kwargs: dict, trace) -> dict:
+    return {**kwargs, 'extensions': {**(kwargs.get('extensions') or {}), 'trace': trace}}
+
 
 def _logged_request(method: str, url: str, **kwargs) -> httpx.Response:
-    """Execute HTTP request with logging if ENABLE_LOGGING is set."""
-    client = _get_or_create_client()
-    start = time.time()
-    error = None
-    status = None
+    """Execute HTTP request with retries, logging each attempt if ENABLE_LOGGING is set."""
+    client = _get_or_create_client(url)
+    if not isinstance(client, CachedClient):
+        kwargs.pop('cache_ttl', None)
 
-    try:
-        response = client.request(method, url, **kwargs)
-        status = response.status_code
-        return response
-    except Exception as e:
-        error = str(e)
-        raise
-    finally:
-        duration_ms = int((time.time() - start) * 1000)
-        debug.log_http_request(method, url, status, duration_ms=duration_ms, error=error)
+    for attempt in Retrying(**_retry_kwargs(method)):
+        with attempt:
+            start = time.time()
+            timer = _RequestTimer()
+            error = None
+            status = None
+            response = None
+
+            try:
+                response = client.request(method, url, **_with_trace(kwargs, timer))
+                status = response.status_code
+            except Exception as e:
+                error = str(e)
+                raise
+            finally:
+                duration_ms = int((time.time() - start) * 1000)
+                debug.log_http_request(method, url, status, duration_ms=duration_ms, error=error,
+                                       attempt=attempt.retry_state.attempt_number, **timer.breakdown(response))
+
+            _check_retryable(response, attempt.retry_state)
+            return response
 
 
 def get(url: str, **kwargs) -> httpx.Response:
@@ -168,12 +950,172 @@ def put(url: str, **kwargs) -> httpx.Response:
 def delete(url: str, **kwargs) -> httpx.Response:
     return _logged_request("DELETE", url, **kwargs)
 
-def get_client(**overrides) -> Union[httpx.Client, CachedClient]:
-    return _get_or_create_client(**overrides)
+
+async def _alogged_request(method: str, url: str, **kwargs) -> httpx.Response:
+    """Execute async HTTP request with retries, logging each attempt if ENABLE_LOGGING is set."""
+    client = _get_or_create_async_client()
+    if not isinstance(client, AsyncCachedClient):
+        kwargs.pop('cache_ttl', None)
+
+    async for attempt in AsyncRetrying(**_retry_kwargs(method)):
+        with attempt:
+            start = time.time()
+            timer = _RequestTimer()
+            error = None
+            status = None
+            response = None
+
+            try:
+                response = await client.request(method, url, **_with_trace(kwargs, timer.atrace))
+                status = response.status_code
+            except Exception as e:
+                error = str(e)
+                raise
+            finally:
+                duration_ms = int((time.time() - start) * 1000)
+                debug.log_http_request(method, url, status, duration_ms=duration_ms, error=error,
+                                       attempt=attempt.retry_state.attempt_number, **timer.breakdown(response))
+
+            _check_retryable(response, attempt.retry_state)
+            return response
+
+
+async def aget(url: str, **kwargs) -> httpx.Response:
+    return await _alogged_request("GET", url, **kwargs)
+
+
+async def apost(url: str, **kwargs) -> httpx.Response:
+    return await _alogged_request("POST", url, **kwargs)
+
+
+async def aput(url: str, **kwargs) -> httpx.Response:
+    return await _alogged_request("PUT", url, **kwargs)
+
+
+async def adelete(url: str, **kwargs) -> httpx.Response:
+    return await _alogged_request("DELETE", url, **kwargs)
+
+
+@contextmanager
+def stream(method: str, url: str, **kwargs) -> Iterator[httpx.Response]:
+    """Open a streaming request with retries and logging if ENABLE_LOGGING is set.
+
+    The body is not read up front: iterate response.iter_bytes() inside the
+    context to consume it in chunks. Only opening the stream is retried; an
+    error while the caller reads the body propagates. The final attempt is
+    logged when the context exits, so its timings include the body transfer.
+    Streamed responses bypass the HTTP cache.
+    """
+    client = _get_or_create_client(url)
+    if isinstance(client, CachedClient):
+        client = client.client
+    kwargs.pop('cache_ttl', None)
+
+    with ExitStack() as stack:
+        for attempt in Retrying(**_retry_kwargs(method)):
+            with attempt:
+                start = time.time()
+                timer = _RequestTimer()
+                attempt_number = attempt.retry_state.attempt_number
+                attempt_stack = ExitStack()
+
+                try:
+                    response = attempt_stack.enter_context(client.stream(method, url, **_with_trace(kwargs, timer)))
+                except Exception as e:
+                    duration_ms = int((time.time() - start) * 1000)
+                    debug.log_http_request(method, url, None, duration_ms=duration_ms, error=str(e),
+                                           attempt=attempt_number, **timer.breakdown())
+                    raise
+
+                try:
+                    _check_retryable(response, attempt.retry_state)
+                except _RetryableStatus:
+                    attempt_stack.close()
+                    duration_ms = int((time.time() - start) * 1000)
+                    debug.log_http_request(method, url, response.status_code, duration_ms=duration_ms,
+                                           attempt=attempt_number, **timer.breakdown(response))
+                    raise
+                stack.push(attempt_stack)
+
+        error = None
+        try:
+            yield response
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            duration_ms = int((time.time() - start) * 1000)
+            debug.log_http_request(method, url, response.status_code, duration_ms=duration_ms, error=error,
+                                   attempt=attempt_number, **timer.breakdown(response))
+
+
+def response_validators(response: httpx.Response) -> Dict[str, str]:
+    """Extract ETag/Last-Modified validators from a response, for storing in state."""
+    validators = {}
+    if etag := response.headers.get("etag"):
+        validators["etag"] = etag
+    if last_modified := response.headers.get("last-modified"):
+        validators["last_modified"] = last_modified
+    return validators
+
+
+def conditional_headers(validators: Optional[Dict]) -> Dict[str, str]:
+    """Build If-None-Match/If-Modified-Since headers from stored validators.
+
+    Pass the result as headers= on the next request; a 304 status then means
+    the resource is unchanged since the validators were recorded.
+    """
+    headers = {}
+    if not validators:
+        return headers
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    return headers
+
+def get_client(url: Optional[str] = None, **overrides) -> Union[httpx.Client, CachedClient]:
+    """Return the sync client, or url's per-host client if per_host_clients is set."""
+    return _get_or_create_client(url, **overrides)
+
+def cache_stats() -> Optional[dict]:
+    """Compression and size stats for the HTTP cache, or None if caching is off."""
+    if _cache_manager is not None:
+        return _cache_manager.stats()
+    if not _client_config['cache_enabled']:
+        return None
+    return _create_cache_manager(_client_config).stats()
+
+def get_async_client(**overrides) -> Union[httpx.AsyncClient, AsyncCachedClient]:
+    """Return the async client singleton. Must be called inside a running event loop."""
+    return _get_or_create_async_client(**overrides)
+
+async def aclose():
+    """Close the async client singleton (call before the event loop shuts down)."""
+    global _async_client, _async_client_loop
+    if _async_client:
+        await _async_client.aclose()
+        _async_client = None
+        _async_client_loop = None
 
 def configure_http(**config):
-    global _client_config, _client
-    _client_config.update(config)
-    if _client:
-        _client.close()
-        _client = None
\ No newline at end of file
+    """Update the HTTP config; clients created from here on use it.
+
+    Existing sync clients are retired rather than closed, so requests already
+    running on another thread finish on their own connections; retired clients
+    are closed at exit.
+    """
+    global _client_config, _async_client, _async_client_loop, _cassette, _cache_manager, _cache_inflight
+    with _client_lock:
+        _client_config.update(config)
+        if _cassette and any(k.startswith('cassette') for k in config):
+            _cassette.save()
+            _cassette = None
+        _retired_clients.extend(_clients.values())
+        _clients.clear()
+        _cache_manager = None
+        _cache_inflight = None
+    # The async client can only be closed from its own loop; drop it so the
+    # next async request builds one with the new config
+    _async_client = None
+    _async_client_loop = None
\ No newline at end of file
@@ -2,18 +2,161 @@ import os
 import io
 import json
 import gzip
+import zlib
 import uuid
-from datetime import datetime
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import date, datetime
+from decimal import Decimal
 from pathlib import Path
+from typing import Iterable, Iterator
 import pyarrow as pa
+import pyarrow.compute as pc
 import pyarrow.parquet as pq
-from deltalake import write_deltalake, DeltaTable
+from deltalake import write_deltalake, DeltaTable, CommitProperties, WriterProperties
+from deltalake.exceptions import TableNotFoundError
 from . import debug
+from .fingerprint import COMMIT_KEY, table_fingerprint, combine, stored_fingerprint
 from .environment import get_data_dir
-from .r2 import is_cloud_mode, upload_bytes, upload_file, upload_fileobj, download_bytes, get_storage_options, get_delta_table_uri, get_bucket_name, get_connector_name
+from .r2 import is_cloud_mode, upload_bytes, upload_file, upload_fileobj, upload_stream, download_bytes, get_storage_options, get_delta_table_uri, get_bucket_name, get_connector_name
 
 
-def upload_data(data: pa.Table, dataset_name: str, metadata: dict = None, mode: str = "append", merge_key: str = None) -> str:
+_tables = {}
+_tables_lock = threading.Lock()
+
+
+def get_table(dataset_name: str, version: int = None) -> DeltaTable | None:
+    """Open a dataset's Delta table, reusing this process's handle for it.
+
+    Handles are cached per table URI. A cached latest-version handle is
+    brought up to date with update_incremental(), which only reads commits
+    newer than the handle's version instead of replaying the whole log.
+    Handles pinned to a version never change and are reused as-is. Writes
+    made through a handle (merge, optimize, alter, write_deltalake(dt, ...))
+    keep it current.
+
+    Returns None if the table doesn't exist; any other error opening it
+    (credentials, network, a corrupt log) is raised.
+    """
+    if is_cloud_mode():
+        table_uri = get_delta_table_uri(dataset_name)
+        storage_options = get_storage_options()
+    else:
+        table_path = Path(get_data_dir()) / "subsets" / dataset_name
+        if not table_path.exists():
+            return None
+        table_uri = str(table_path)
+        storage_options = None
+
+    key = (table_uri, version)
+    with _tables_lock:
+        dt = _tables.get(key)
+        if dt is not None:
+            if version is None:
+                dt.update_incremental()
+            return dt
+
+        try:
+            dt = DeltaTable(table_uri, version=version, storage_options=storage_options)
+        except TableNotFoundError:
+            return None
+        _tables[key] = dt
+        return dt
+
+
+def _fingerprint_commit(data: pa.Table, mode: str, existing) -> CommitProperties | None:
+    """Commit properties recording the fingerprint of the table after this write.
+
+    Appends add the batch to the stored fingerprint; if the table has none
+    (e.g. its last write was a merge), no fingerprint is recorded. Neither is
+    one if fingerprinting fails, so the write itself always goes ahead.
+    """
+    try:
+        fingerprint = table_fingerprint(data)
+        if mode == "append" and existing is not None:
+            previous = stored_fingerprint(existing)
+            if previous is None:
+                return None
+            fingerprint = combine(previous, fingerprint)
+    except Exception as e:
+        print(f"  -> Fingerprint: skipped ({e})")
+        return None
+    return CommitProperties(custom_metadata={COMMIT_KEY: json.dumps(fingerprint)})
+
+
+def _table_row_count(dt: DeltaTable) -> int | None:
+    """Total rows from the num_records stats in the Delta log (no data scan).
+
+    Returns None if any file was written without stats.
+    """
+    num_records = pa.table(dt.get_add_actions(flatten=True))["num_records"]
+    if num_records.null_count:
+        return None
+    return pc.sum(num_records).as_py() or 0
+
+
+def _sql_literal(value) -> str | None:
+    """Render a key bound as a merge predicate literal, or None if it has no
+    safe literal form (floats, tz-aware timestamps, nested values)."""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, Decimal)):
+        return str(value)
+    if isinstance(value, datetime):
+        return f"'{value.isoformat()}'" if value.tzinfo is None else None
+    if isinstance(value, date):
+        return f"'{value.isoformat()}'"
+    if isinstance(value, str):
+        escaped = value.replace("'", "''")
+        return f"'{escaped}'"
+    return None
+
+
+def _merge_predicate(data: pa.Table, merge_keys: list[str]) -> str:
+    """Match on every key column, bounded by the source batch's key ranges.
+
+    Key columns with nulls in the source match null-safely. Key columns
+    without nulls also get a min/max range, so file statistics (and
+    partition values) let the merge skip files that can't contain a match.
+    """
+    clauses = []
+    ranges = []
+    for key in merge_keys:
+        column = data[key]
+        if column.null_count:
+            clauses.append(f"(target.{key} IS NOT DISTINCT FROM source.{key})")
+            continue
+        clauses.append(f"(target.{key} = source.{key})")
+
+        bounds = pc.min_max(column)
+        low, high = _sql_literal(bounds["min"].as_py()), _sql_literal(bounds["max"].as_py())
+        if low is not None and high is not None:
+            ranges.append(f"(target.{key} >= {low}) AND (target.{key} <= {high})")
+
+    return " AND ".join(clauses + ranges)
+
+
+def _merge_into(dt: DeltaTable, data: pa.Table, merge_keys: list[str], writer_properties: WriterProperties = None) -> dict:
+    """Upsert data into dt on merge_keys, returning the merge metrics."""
+    updates = {col: f"source.{col}" for col in data.column_names}
+    return (
+        dt.merge(
+            source=data,
+            predicate=_merge_predicate(data, merge_keys),
+            source_alias="source",
+            target_alias="target",
+            writer_properties=writer_properties
+        )
+        .when_matched_update(updates=updates)
+        .when_not_matched_insert(updates=updates)
+        .execute()
+    )
+
+
+def upload_data(data: pa.Table, dataset_name: str, metadata: dict = None, mode: str = "append",
+                merge_key: str | list[str] = None, partition_by: str | list[str] = None,
+                target_file_size: int = None, row_group_size: int = None) -> str:
     """Upload a PyArrow table to a Delta table.
 
     In local mode: writes to DATA_DIR/subsets/{dataset_name}
@@ -24,7 +167,12 @@ def upload_data(data: pa.Table, dataset_name: str, metadata: dict = None, mode:
         dataset_name: Name of the dataset (used as directory name)
         metadata: Optional metadata dict with keys: title, description, columns
         mode: 'append', 'overwrite', or 'merge'
-        merge_key: Required when mode='merge', the column to merge on
+        merge_key: Required when mode='merge', the column (or list of columns)
+            forming the natural key to merge on
+        partition_by: Column(s) to partition a new table by (e.g. a year column
+            derived from date). Must match the existing table's partitioning.
+        target_file_size: Target size in bytes for each written data file
+        row_group_size: Maximum rows per Parquet row group
     """
     if mode not in ("append", "overwrite", "merge"):
         raise ValueError(f"Invalid mode '{mode}'. Must be 'append', 'overwrite', or 'merge'.")
@@ -32,6 +180,11 @@ def upload_data(data: pa.Table, dataset_name: str, metadata: dict = None, mode:
     if mode == "merge" and not merge_key:
         raise ValueError("merge_key is required when mode='merge'")
 
+    merge_keys = [merge_key] if isinstance(merge_key, str) else list(merge_key or [])
+    missing_keys = [key for key in merge_keys if key not in data.column_names]
+    if missing_keys:
+        raise ValueError(f"merge_key columns not in data: {', '.join(missing_keys)}")
+
     if mode == "overwrite":
         print(f"⚠️  Warning: Overwriting {dataset_name} - all existing data will be replaced")
 
@@ -44,6 +197,18 @@ def upload_data(data: pa.Table, dataset_name: str, metadata: dict = None, mode:
     mode_label = {"append": "Appending to", "overwrite": "Overwriting", "merge": "Merging into"}[mode]
     print(f"{mode_label} {dataset_name}: {len(data)} rows, {len(data.schema)} cols ({columns}), {size_mb} MB")
 
+    # Row counts for the output log; merges refine these from their metrics
+    rows_inserted = len(data)
+    rows_updated = 0
+    total_rows = len(data) if mode == "overwrite" else None
+
+    # File layout, shared by every write below
+    layout = {
+        "partition_by": partition_by,
+        "target_file_size": target_file_size,
+        "writer_properties": WriterProperties(max_row_group_size=row_group_size) if row_group_size else None,
+    }
+
     # Extract metadata for Delta table
     table_name = metadata.get("title") if metadata else None
     table_description = json.dumps(metadata) if metadata else None
@@ -54,41 +219,38 @@ def upload_data(data: pa.Table, dataset_name: str, metadata: dict = None, mode:
         storage_options = get_storage_options()
 
         if mode == "merge":
-            try:
-                dt = DeltaTable(table_uri, storage_options=storage_options)
-                updates = {col: f"source.{col}" for col in data.column_names}
-                (
-                    dt.merge(
-                        source=data,
-                        predicate=f"target.{merge_key} = source.{merge_key}",
-                        source_alias="source",
-                        target_alias="target"
-                    )
-                    .when_matched_update(updates=updates)
-                    .when_not_matched_insert(updates=updates)
-                    .execute()
-                )
-                result = dt.to_pyarrow_table()
-                print(f"Merged: table now has {len(result)} total rows")
-            except Exception:
+            dt = get_table(dataset_name)
+            if dt is not None:
+                metrics = _merge_into(dt, data, merge_keys, layout["writer_properties"])
+                rows_inserted = metrics["num_target_rows_inserted"]
+                rows_updated = metrics["num_target_rows_updated"]
+                total_rows = _table_row_count(dt)
+                print(f"Merged: {rows_inserted} inserted, {rows_updated} updated, table now has {total_rows} total rows")
+            else:
                 # Table doesn't exist, create it
                 write_deltalake(
                     table_uri,
                     data,
                     storage_options=storage_options,
                     name=table_name,
-                    description=table_description
+                    description=table_description,
+                    commit_properties=_fingerprint_commit(data, mode, None),
+                    **layout
                 )
+                total_rows = len(data)
                 print(f"Created new table {dataset_name}")
         else:
+            existing = get_table(dataset_name)
             write_deltalake(
-                table_uri,
+                existing or table_uri,
                 data,
                 mode=mode,
                 storage_options=storage_options,
                 name=table_name,
                 description=table_description,
-                schema_mode="merge" if mode == "append" else "overwrite"
+                schema_mode="merge" if mode == "append" else "overwrite",
+                commit_properties=_fingerprint_commit(data, mode, existing),
+                **layout
             )
 
         output_path = table_uri
@@ -97,33 +259,35 @@ def upload_data(data: pa.Table, dataset_name: str, metadata: dict = None, mode:
         table_path = Path(get_data_dir()) / "subsets" / dataset_name
 
         if mode == "merge":
-            if not table_path.exists():
-                write_deltalake(str(table_path), data, name=table_name, description=table_description)
+            dt = get_table(dataset_name)
+            if dt is None:
+                write_deltalake(
+                    str(table_path),
+                    data,
+                    name=table_name,
+                    description=table_description,
+                    commit_properties=_fingerprint_commit(data, mode, None),
+                    **layout
+                )
+                total_rows = len(data)
                 print(f"Created new table {dataset_name}")
             else:
-                dt = DeltaTable(str(table_path))
-                updates = {col: f"source.{col}" for col in data.column_names}
-                (
-                    dt.merge(
-                        source=data,
-                        predicate=f"target.{merge_key} = source.{merge_key}",
-                        source_alias="source",
-                        target_alias="target"
-                    )
-                    .when_matched_update(updates=updates)
-                    .when_not_matched_insert(updates=updates)
-                    .execute()
-                )
-                result = dt.to_pyarrow_table()
-                print(f"Merged: table now has {len(result)} total rows")
+                metrics = _merge_into(dt, data, merge_keys, layout["writer_properties"])
+                rows_inserted = metrics["num_target_rows_inserted"]
+                rows_updated = metrics["num_target_rows_updated"]
+                total_rows = _table_row_count(dt)
+                print(f"Merged: {rows_inserted} inserted, {rows_updated} updated, table now has {total_rows} total rows")
         else:
+            existing = get_table(dataset_name)
             write_deltalake(
-                str(table_path),
+                existing or str(table_path),
                 data,
                 mode=mode,
                 name=table_name,
                 description=table_description,
-                schema_mode="merge" if mode == "append" else "overwrite"
+                schema_mode="merge" if mode == "append" else "overwrite",
+                commit_properties=_fingerprint_commit(data, mode, existing),
+                **layout
             )
 
         output_path = str(table_path)
@@ -141,6 +305,9 @@ def upload_data(data: pa.Table, dataset_name: str, metadata: dict = None, mode:
         columns=data.column_names,
         column_count=len(data.schema),
         null_counts=null_counts,
+        rows_inserted=rows_inserted,
+        rows_updated=rows_updated,
+        total_rows=total_rows,
         mode=mode
     )
 
@@ -209,7 +376,9 @@ def save_state(asset: str, state_data: dict) -> str:
 def has_changed(new_data: pa.Table, asset_name: str) -> bool:
     """Check if new data differs from the existing asset.
 
-    Compares the new data with what's already stored in the Delta table.
+    Compares an order-independent fingerprint of the new data with the one
+    upload_data recorded in the Delta commit log, so only the log is read.
+    Tables without a recorded fingerprint are read and fingerprinted instead.
     Returns True if data has changed or if no previous data exists.
 
     Args:
@@ -219,60 +388,113 @@ def has_changed(new_data: pa.Table, asset_name: str) -> bool:
     Returns:
         bool: True if data has changed or doesn't exist, False if unchanged
     """
-    if is_cloud_mode():
-        table_uri = get_delta_table_uri(asset_name)
-        storage_options = get_storage_options()
+    dt = get_table(asset_name)
+    if dt is None:
+        return True
 
-        try:
-            dt = DeltaTable(table_uri, storage_options=storage_options)
-            existing_data = dt.to_pyarrow_table()
+    try:
+        existing = stored_fingerprint(dt) or table_fingerprint(dt.to_pyarrow_table())
+    except Exception:
+        return True
 
-            if len(new_data) != len(existing_data):
-                return True
+    return table_fingerprint(new_data) != existing
 
-            if new_data.schema != existing_data.schema:
-                return True
 
-            new_bytes = new_data.to_pandas().to_csv(index=False)
-            existing_bytes = existing_data.to_pandas().to_csv(index=False)
+def _row_identity(table: pa.Table, columns: list[str]) -> pa.Table:
+    """Null-safe, type-normalised copy of columns for whole-row comparison.
 
-            return new_bytes != existing_bytes
+    Each column becomes its string form (nulls as "") plus a null flag, so a
+    join matches nulls to nulls and the stored table's Delta types compare
+    equal to the freshly parsed ones.
+    """
+    identity = {}
+    for i, col in enumerate(columns):
+        values = pc.cast(table[col], pa.string())
+        identity[f"v{i}"] = values.fill_null("")
+        identity[f"n{i}"] = pc.is_null(values)
+    return pa.table(identity)
 
-        except Exception:
-            return True
-    else:
-        table_path = Path(get_data_dir()) / "subsets" / asset_name
 
-        if not table_path.exists():
-            return True
+def upload_changes(data: pa.Table, dataset_name: str, key: str | list[str], metadata: dict = None, **layout) -> str:
+    """Merge only the rows of data that are new or revised since the last run.
 
-        try:
-            dt = DeltaTable(str(table_path))
-            existing_data = dt.to_pyarrow_table()
+    Rows already stored with identical values are dropped before the merge,
+    so re-running on unchanged input writes nothing. A stored table with
+    duplicate keys (e.g. from earlier full-history appends), or without one
+    of data's columns, is overwritten once with data.
+
+    Args:
+        data: The full PyArrow table produced by the transform
+        dataset_name: Name of the dataset
+        key: Column (or list of columns) identifying a row
+        metadata: Optional metadata dict, passed on to upload_data
+        **layout: partition_by, target_file_size and row_group_size, passed on
+            to upload_data
+    """
+    keys = [key] if isinstance(key, str) else list(key)
+
+    try:
+        existing = load_asset(dataset_name)
+    except FileNotFoundError:
+        return upload_data(data, dataset_name, metadata, mode="merge", merge_key=keys, **layout)
 
-            if len(new_data) != len(existing_data):
-                return True
+    if existing.group_by(keys).aggregate([([], "count_all")]).num_rows < existing.num_rows:
+        print(f"{dataset_name} has duplicate keys ({', '.join(keys)}), rewriting it in full")
+        return upload_data(data, dataset_name, metadata, mode="overwrite", **layout)
 
-            if new_data.schema != existing_data.schema:
-                return True
+    # Merges don't evolve the schema, so a new column needs a full rewrite
+    added = [col for col in data.column_names if col not in existing.column_names]
+    if added:
+        print(f"{dataset_name} gained columns ({', '.join(added)}), rewriting it in full")
+        return upload_data(data, dataset_name, metadata, mode="overwrite", **layout)
+
+    identity = _row_identity(data, data.column_names).append_column(
+        "__row", pa.array(range(data.num_rows), pa.int64())
+    )
+    stored = _row_identity(existing, data.column_names)
+    unmatched = identity.join(stored, keys=stored.column_names, join_type="left anti")
+    changes = data.take(unmatched.sort_by("__row")["__row"])
+
+    print(f"{dataset_name}: {changes.num_rows:,} new or revised of {data.num_rows:,} rows")
+    return upload_data(changes, dataset_name, metadata, mode="merge", merge_key=keys, **layout)
 
-            new_bytes = new_data.to_pandas().to_csv(index=False)
-            existing_bytes = existing_data.to_pandas().to_csv(index=False)
 
-            return new_bytes != existing_bytes
+def _open_asset(asset_name: str, version: int = None) -> DeltaTable:
+    """Open an asset's Delta table (optionally at an older version)."""
+    dt = get_table(asset_name, version)
+    if dt is None:
+        location = get_delta_table_uri(asset_name) if is_cloud_mode() else Path(get_data_dir()) / "subsets" / asset_name
+        raise FileNotFoundError(f"No Delta table found at {location}")
+    return dt
 
-        except Exception:
-            return True
+
+def _asset_scan(asset_name: str, filters, version: int = None):
+    """The asset as a pyarrow dataset plus its filter as an expression.
+
+    The dataset carries each file's partition values and min/max stats from
+    the Delta log, so filtering skips files that can't match without
+    reading them.
+    """
+    dataset = _open_asset(asset_name, version).to_pyarrow_dataset()
+    expression = pq.filters_to_expression(filters) if filters is not None else None
+    return dataset, expression
 
 
-def load_asset(asset_name: str) -> pa.Table:
+def load_asset(asset_name: str, columns: list[str] = None, filters=None, version: int = None) -> pa.Table:
     """Load a previously saved asset from Delta table.
 
     In local mode: reads from DATA_DIR/subsets/{asset_name}
     In cloud mode: reads from R2 s3://{bucket}/data/subsets/{asset_name}
 
+    Only the selected columns are read, and only from files whose partition
+    values and statistics can match filters.
+
     Args:
         asset_name: The dataset/asset name (e.g., 'indicators', 'series')
+        columns: Columns to read (all if None)
+        filters: Row filter, either a pyarrow.dataset expression or DNF tuples,
+            e.g. [("geo_type", "=", "State"), ("month", ">=", "2020-01")]
+        version: Table version to read (latest if None)
 
     Returns:
         pa.Table: The loaded PyArrow table
@@ -280,23 +502,24 @@ def load_asset(asset_name: str) -> pa.Table:
     Raises:
         FileNotFoundError: If no Delta table found
     """
-    if is_cloud_mode():
-        table_uri = get_delta_table_uri(asset_name)
-        storage_options = get_storage_options()
+    dataset, expression = _asset_scan(asset_name, filters, version)
+    return dataset.to_table(columns=columns, filter=expression)
 
-        try:
-            dt = DeltaTable(table_uri, storage_options=storage_options)
-            return dt.to_pyarrow_table()
-        except Exception as e:
-            raise FileNotFoundError(f"No Delta table found at {table_uri}") from e
-    else:
-        table_path = Path(get_data_dir()) / "subsets" / asset_name
 
-        if not table_path.exists():
-            raise FileNotFoundError(f"No Delta table found at {table_path}")
+def iter_asset_batches(asset_name: str, columns: list[str] = None, filters=None, version: int = None,
+                       batch_size: int = 131_072) -> Iterator[pa.RecordBatch]:
+    """Stream a previously saved asset as RecordBatches, with bounded memory.
+
+    Takes the same columns/filters/version arguments as load_asset.
 
-        dt = DeltaTable(str(table_path))
-        return dt.to_pyarrow_table()
+    Args:
+        batch_size: Maximum rows per batch
+
+    Raises:
+        FileNotFoundError: If no Delta table found
+    """
+    dataset, expression = _asset_scan(asset_name, filters, version)
+    yield from dataset.to_batches(columns=columns, filter=expression, batch_size=batch_size)
 
 
 def _get_raw_path(asset_id: str, extension: str) -> Path:
@@ -312,6 +535,182 @@ def _get_raw_r2_key(asset_id: str, extension: str) -> str:
     return f"{connector}/data/raw/{asset_id}.{extension}"
 
 
+RAW_CACHE_MAX_BYTES = int(os.environ.get('RAW_CACHE_MAX_BYTES', str(256 * 1024 * 1024)))
+
+
+class _RawCache:
+    """Process-local LRU cache of loaded raw assets, bounded by max_bytes.
+
+    Only immutable values are cached (bytes, str, pa.Table; JSON as its
+    bytes), so callers can't modify what a later load gets. Entries are
+    keyed by (asset_id, kind, version), where the version is bumped when
+    this process starts saving the asset and again once the save is
+    recorded. A load caches its value under the version it started at, and
+    only if that is still current, so a stale copy is never served.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def _key(self, asset_id: str, kind: str) -> tuple:
+        return (asset_id, kind, self._versions.get(asset_id, 0))
+
+    def get(self, asset_id: str, kind: str):
+        with self._lock:
+            key = self._key(asset_id, kind)
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def version(self, asset_id: str) -> int:
+        with self._lock:
+            return self._versions.get(asset_id, 0)
+
+    def put(self, asset_id: str, kind: str, value, size: int, version: int):
+        """Cache a value loaded when the asset was at `version`.
+
+        The value is dropped if the asset was saved (and the version bumped)
+        while it was being loaded, since it may be the old content.
+        """
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if version != self._versions.get(asset_id, 0):
+                return
+            key = (asset_id, kind, version)
+            if key in self._entries:
+                return
+            self._entries[key] = (value, size)
+            self._size += size
+            while self._size > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+
+    def invalidate(self, asset_id: str):
+        with self._lock:
+            self._versions[asset_id] = self._versions.get(asset_id, 0) + 1
+            for key in [k for k in self._entries if k[0] == asset_id]:
+                self._size -= self._entries.pop(key)[1]
+
+
+_raw_cache = _RawCache(RAW_CACHE_MAX_BYTES)
+
+
+def _memoized(asset_id: str, kind: str, load, size=len):
+    """Return the cached value for (asset_id, kind), loading it on a miss."""
+    version = _raw_cache.version(asset_id)
+    value = _raw_cache.get(asset_id, kind)
+    if value is None:
+        value = load()
+        _raw_cache.put(asset_id, kind, value, size(value), version)
+    return value
+
+
+RAW_MANIFEST_ID = "_manifest"
+# Optional directory for downloaded raw files, named by content hash; loaders
+# skip the download when the manifest hash is already there
+RAW_DISK_CACHE_DIR = os.environ.get('RAW_DISK_CACHE_DIR') or None
+
+_raw_manifest = None
+_raw_manifest_lock = threading.Lock()
+
+
+def _load_raw_manifest() -> dict:
+    """The connector's raw manifest (raw/_manifest.json), loaded once per process.
+
+    Maps "{asset_id}.{format}" to the stored file: key (file name under raw/),
+    format, compression, size, sha256, encoding ('utf-8', 'binary' or None if
+    unknown) and written_at.
+    Callers must hold _raw_manifest_lock.
+    """
+    global _raw_manifest
+    if _raw_manifest is None:
+        if is_cloud_mode():
+            data = download_bytes(_get_raw_r2_key(RAW_MANIFEST_ID, "json"))
+        else:
+            path = _get_raw_path(RAW_MANIFEST_ID, "json")
+            data = path.read_bytes() if path.exists() else None
+        _raw_manifest = json.loads(data) if data else {}
+    return _raw_manifest
+
+
+def _record_raw_asset(asset_id: str, extension: str, size: int, sha256: str, encoding: str = None):
+    """Add a just-written raw file to the manifest and persist the manifest."""
+    compression = "gzip" if extension.endswith(".gz") else None
+    fmt = extension[:-len(".gz")] if compression else extension
+    entry = {
+        "key": f"{asset_id}.{extension}",
+        "format": fmt,
+        "compression": compression,
+        "size": size,
+        "sha256": sha256,
+        "encoding": encoding,
+        "written_at": datetime.now().isoformat(),
+    }
+
+    with _raw_manifest_lock:
+        manifest = _load_raw_manifest()
+        manifest[f"{asset_id}.{fmt}"] = entry
+        content = json.dumps(manifest, indent=2).encode('utf-8')
+        if is_cloud_mode():
+            upload_bytes(content, _get_raw_r2_key(RAW_MANIFEST_ID, "json"))
+        else:
+            path = _get_raw_path(RAW_MANIFEST_ID, "json")
+            temp_path = path.with_name(f"{path.name}.part")
+            temp_path.write_bytes(content)
+            os.replace(temp_path, path)
+
+    # Drop anything loaded while the file was being written
+    _raw_cache.invalidate(asset_id)
+
+
+def _raw_entry(asset_id: str, fmt: str) -> dict | None:
+    with _raw_manifest_lock:
+        return _load_raw_manifest().get(f"{asset_id}.{fmt}")
+
+
+def _fetch_raw_entry(entry: dict) -> bytes | None:
+    """The stored (still compressed) bytes of a manifest entry, in one request.
+
+    Returns None if the file is missing, e.g. deleted behind the manifest's back.
+    """
+    if not is_cloud_mode():
+        path = Path(get_data_dir()) / "raw" / entry["key"]
+        return path.read_bytes() if path.exists() else None
+
+    cached_path = Path(RAW_DISK_CACHE_DIR) / entry["sha256"] if RAW_DISK_CACHE_DIR else None
+    if cached_path and cached_path.exists():
+        return cached_path.read_bytes()
+
+    data = download_bytes(f"{get_connector_name()}/data/raw/{entry['key']}")
+    if data is not None and cached_path:
+        cached_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = cached_path.with_name(f"{cached_path.name}.{uuid.uuid4().hex}.part")
+        temp_path.write_bytes(data)
+        os.replace(temp_path, cached_path)
+    return data
+
+
+def _load_raw_entry(asset_id: str, fmt: str) -> tuple[dict, bytes] | None:
+    """Resolve an asset through the manifest: (entry, decompressed bytes), or
+    None if it isn't in the manifest and the caller should probe instead."""
+    entry = _raw_entry(asset_id, fmt)
+    if entry is None:
+        return None
+    data = _fetch_raw_entry(entry)
+    if data is None:
+        return None
+    if entry["compression"] == "gzip":
+        data = gzip.decompress(data)
+    return entry, data
+
+
 def save_raw_file(content: str | bytes, asset_id: str, extension: str = "txt") -> str:
     """Generic raw saver for CSV, XML, ZIP, etc.
 
@@ -323,35 +722,168 @@ def save_raw_file(content: str | bytes, asset_id: str, extension: str = "txt") -
         asset_id: The identifier for the asset
         extension: File extension (e.g., 'csv', 'xml', 'zip')
     """
+    _raw_cache.invalidate(asset_id)
+
+    data = content.encode('utf-8') if isinstance(content, str) else content
+
+    # Record whether the file reads back as text, so load_raw_file needn't guess
+    try:
+        data.decode('utf-8')
+        encoding = 'utf-8'
+    except UnicodeDecodeError:
+        encoding = 'binary'
+
     if is_cloud_mode():
         key = _get_raw_r2_key(asset_id, extension)
-        if isinstance(content, str):
-            data = content.encode('utf-8')
-        else:
-            data = content
         uri = upload_bytes(data, key)
         print(f"  -> R2: Saved {asset_id}.{extension}")
+    else:
+        path = _get_raw_path(asset_id, extension)
+        with open(path, 'wb') as f:
+            f.write(data)
+        print(f"  -> Raw Cache: Saved {asset_id}.{extension}")
+        uri = str(path)
+
+    _record_raw_asset(asset_id, extension, len(data), hashlib.sha256(data).hexdigest(), encoding)
+    return uri
+
+
+def _gzip_chunks(chunks: Iterable[bytes]) -> Iterable[bytes]:
+    """Gzip-compress a stream of chunks incrementally."""
+    compressor = zlib.compressobj(wbits=31)  # wbits=31 -> gzip container
+    for chunk in chunks:
+        out = compressor.compress(chunk)
+        if out:
+            yield out
+    yield compressor.flush()
+
+
+def save_raw_stream(chunks: Iterable[bytes], asset_id: str, extension: str = "bin", compress: bool = False) -> str:
+    """Stream raw bytes to storage chunk by chunk, with bounded memory.
+
+    In local mode: writes to DATA_DIR/raw/{asset_id}.{extension}[.gz] via a temp
+        file that is renamed into place once complete
+    In cloud mode: uploads to R2 (multipart for large bodies, no disk write)
+
+    Args:
+        chunks: Iterable of bytes, e.g. response.iter_bytes() from http_client.stream
+        asset_id: The identifier for the asset
+        extension: File extension (e.g., 'csv', 'zip')
+        compress: Gzip the stream on the fly and append '.gz' to the extension
+    """
+    _raw_cache.invalidate(asset_id)
+
+    if compress:
+        chunks = _gzip_chunks(chunks)
+        extension = f"{extension}.gz"
+
+    # Hash and measure the stored bytes on their way out, for the manifest
+    digest = hashlib.sha256()
+    size = 0
+
+    def measured(chunks):
+        nonlocal size
+        for chunk in chunks:
+            digest.update(chunk)
+            size += len(chunk)
+            yield chunk
+
+    chunks = measured(chunks)
+
+    if is_cloud_mode():
+        key = _get_raw_r2_key(asset_id, extension)
+        uri = upload_stream(chunks, key)
+        print(f"  -> R2: Saved {asset_id}.{extension}")
+        _record_raw_asset(asset_id, extension, size, digest.hexdigest())
         return uri
     else:
         path = _get_raw_path(asset_id, extension)
+        temp_path = path.with_name(f"{path.name}.part")
 
-        if isinstance(content, str):
-            with open(path, 'w', encoding='utf-8') as f:
-                f.write(content)
-        else:
-            with open(path, 'wb') as f:
-                f.write(content)
+        try:
+            with open(temp_path, 'wb') as f:
+                for chunk in chunks:
+                    f.write(chunk)
+            os.replace(temp_path, path)
+        finally:
+            if temp_path.exists():
+                temp_path.unlink()
 
         print(f"  -> Raw Cache: Saved {asset_id}.{extension}")
+        _record_raw_asset(asset_id, extension, size, digest.hexdigest())
         return str(path)
 
 
+def load_raw_bytes(asset_id: str, extension: str) -> bytes:
+    """Load a single raw asset as bytes. Auto-detects gzip compression.
+
+    In local mode: reads from DATA_DIR/raw/{asset_id}.{extension}[.gz]
+    In cloud mode: downloads from R2
+
+    Unlike load_raw_file, the content is never decoded, so it can be handed
+    straight to a parser (e.g. pyarrow.csv.read_csv(pa.py_buffer(data))).
+    Repeated loads in a process are served from memory.
+    """
+    return _memoized(asset_id, f"bytes:{extension}", lambda: _read_raw_bytes(asset_id, extension))
+
+
+def _read_raw_bytes(asset_id: str, extension: str) -> bytes:
+    if resolved := _load_raw_entry(asset_id, extension):
+        return resolved[1]
+
+    # Not in the manifest (written before it existed): probe for the file
+    if is_cloud_mode():
+        # Try uncompressed first
+        data = download_bytes(_get_raw_r2_key(asset_id, extension))
+        if data is not None:
+            return data
+
+        # Try compressed
+        data = download_bytes(_get_raw_r2_key(asset_id, f"{extension}.gz"))
+        if data is not None:
+            return gzip.decompress(data)
+
+        raise FileNotFoundError(f"Raw asset '{asset_id}.{extension}' not found in R2.")
+    else:
+        # Try uncompressed first
+        path = _get_raw_path(asset_id, extension)
+        if path.exists():
+            return path.read_bytes()
+
+        # Try compressed
+        path = _get_raw_path(asset_id, f"{extension}.gz")
+        if path.exists():
+            with gzip.open(path, 'rb') as f:
+                return f.read()
+
+        raise FileNotFoundError(f"Raw asset '{asset_id}.{extension}' not found.")
+
+
 def load_raw_file(asset_id: str, extension: str = "txt") -> str | bytes:
     """Generic raw loader for CSV, XML, ZIP, etc.
 
     In local mode: reads from DATA_DIR/raw/{asset_id}.{extension}
     In cloud mode: downloads from R2
+
+    Repeated loads in a process are served from memory.
     """
+    return _memoized(asset_id, f"file:{extension}", lambda: _read_raw_file(asset_id, extension))
+
+
+def _read_raw_file(asset_id: str, extension: str) -> str | bytes:
+    if resolved := _load_raw_entry(asset_id, extension):
+        entry, data = resolved
+        if entry.get("encoding") == 'binary':
+            return data
+        if entry.get("encoding") == 'utf-8':
+            return data.decode('utf-8')
+        # Streamed files don't record an encoding
+        try:
+            return data.decode('utf-8')
+        except UnicodeDecodeError:
+            return data
+
+    # Not in the manifest (written before it existed): fall back to decoding
     if is_cloud_mode():
         key = _get_raw_r2_key(asset_id, extension)
         data = download_bytes(key)
@@ -384,34 +916,32 @@ def save_raw_json(data: any, asset_id: str, compress: bool = False) -> str:
 
     Use compress=True for massive datasets to save storage space.
     """
+    _raw_cache.invalidate(asset_id)
+
     ext = "json.gz" if compress else "json"
 
+    if compress:
+        buffer = io.BytesIO()
+        with gzip.GzipFile(fileobj=buffer, mode='wb') as gz:
+            with io.TextIOWrapper(gz, encoding='utf-8') as f:
+                json.dump(data, f)
+        content = buffer.getvalue()
+    else:
+        content = json.dumps(data, indent=2).encode('utf-8')
+
     if is_cloud_mode():
         key = _get_raw_r2_key(asset_id, ext)
-        if compress:
-            buffer = io.BytesIO()
-            with gzip.GzipFile(fileobj=buffer, mode='wb') as gz:
-                with io.TextIOWrapper(gz, encoding='utf-8') as f:
-                    json.dump(data, f)
-            content = buffer.getvalue()
-        else:
-            content = json.dumps(data, indent=2).encode('utf-8')
-
         uri = upload_bytes(content, key)
         print(f"  -> R2: Saved {asset_id}.{ext}")
-        return uri
     else:
         path = _get_raw_path(asset_id, ext)
-
-        if compress:
-            with gzip.open(path, 'wt', encoding='utf-8') as f:
-                json.dump(data, f)
-        else:
-            with open(path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2)
-
+        with open(path, 'wb') as f:
+            f.write(content)
         print(f"  -> Raw Cache: Saved {asset_id}.{ext}")
-        return str(path)
+        uri = str(path)
+
+    _record_raw_asset(asset_id, ext, len(content), hashlib.sha256(content).hexdigest(), 'utf-8')
+    return uri
 
 
 def load_raw_json(asset_id: str) -> any:
@@ -419,39 +949,53 @@ def load_raw_json(asset_id: str) -> any:
 
     In local mode: reads from DATA_DIR/raw/{asset_id}.json[.gz]
     In cloud mode: downloads from R2
+
+    Repeated loads in a process are served from memory (the decompressed
+    bytes are cached; each call parses a fresh object).
     """
+    return json.loads(_memoized(asset_id, "json", lambda: _read_raw_json_bytes(asset_id)))
+
+
+def _read_raw_json_bytes(asset_id: str) -> bytes:
+    if resolved := _load_raw_entry(asset_id, "json"):
+        return resolved[1]
+
+    # Not in the manifest (written before it existed): probe for the file
     if is_cloud_mode():
         # Try uncompressed first
-        key = _get_raw_r2_key(asset_id, "json")
-        data = download_bytes(key)
+        data = download_bytes(_get_raw_r2_key(asset_id, "json"))
         if data is not None:
-            return json.loads(data.decode('utf-8'))
+            return data
 
         # Try compressed
-        key = _get_raw_r2_key(asset_id, "json.gz")
-        data = download_bytes(key)
+        data = download_bytes(_get_raw_r2_key(asset_id, "json.gz"))
         if data is not None:
-            with gzip.GzipFile(fileobj=io.BytesIO(data), mode='rb') as gz:
-                with io.TextIOWrapper(gz, encoding='utf-8') as f:
-                    return json.load(f)
+            return gzip.decompress(data)
 
         raise FileNotFoundError(f"Raw asset '{asset_id}' not found in R2.")
     else:
         # Try uncompressed first
         path = _get_raw_path(asset_id, "json")
         if path.exists():
-            with open(path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return path.read_bytes()
 
         # Try compressed
         path = _get_raw_path(asset_id, "json.gz")
         if path.exists():
-            with gzip.open(path, 'rt', encoding='utf-8') as f:
-                return json.load(f)
+            with gzip.open(path, 'rb') as f:
+                return f.read()
 
         raise FileNotFoundError(f"Raw asset '{asset_id}' not found.")
 
 
+def _file_sha256(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
 def save_raw_parquet(data: pa.Table, asset_id: str, metadata: dict = None) -> str:
     """Save raw PyArrow table as Parquet with optional metadata.
 
@@ -467,6 +1011,8 @@ def save_raw_parquet(data: pa.Table, asset_id: str, metadata: dict = None) -> st
     Returns:
         Path or URI to the saved file
     """
+    _raw_cache.invalidate(asset_id)
+
     # Store metadata in the Parquet file's key-value metadata
     if metadata:
         existing_metadata = data.schema.metadata or {}
@@ -481,6 +1027,7 @@ def save_raw_parquet(data: pa.Table, asset_id: str, metadata: dict = None) -> st
             key = _get_raw_r2_key(asset_id, "parquet")
             uri = upload_file(temp_path, key)
             print(f"  -> R2: Saved {asset_id}.parquet ({data.num_rows:,} rows)")
+            _record_raw_asset(asset_id, "parquet", os.path.getsize(temp_path), _file_sha256(temp_path))
             return uri
         finally:
             # Always delete temp file
@@ -490,6 +1037,7 @@ def save_raw_parquet(data: pa.Table, asset_id: str, metadata: dict = None) -> st
         path = _get_raw_path(asset_id, "parquet")
         pq.write_table(data, path, compression='snappy')
         print(f"  -> Raw Cache: Saved {asset_id}.parquet ({data.num_rows:,} rows)")
+        _record_raw_asset(asset_id, "parquet", path.stat().st_size, _file_sha256(path))
         return str(path)
 
 
@@ -499,12 +1047,21 @@ def load_raw_parquet(asset_id: str) -> pa.Table:
     In local mode: reads from DATA_DIR/raw/{asset_id}.parquet
     In cloud mode: downloads from R2 to temp file, reads, then deletes
 
+    Repeated loads in a process are served from memory.
+
     Args:
         asset_id: Identifier for the asset
 
     Returns:
         PyArrow table
     """
+    return _memoized(asset_id, "parquet", lambda: _read_raw_parquet(asset_id), size=lambda table: table.nbytes)
+
+
+def _read_raw_parquet(asset_id: str) -> pa.Table:
+    if resolved := _load_raw_entry(asset_id, "parquet"):
+        return pq.read_table(pa.BufferReader(resolved[1]))
+
     if is_cloud_mode():
         key = _get_raw_r2_key(asset_id, "parquet")
         data = download_bytes(key)
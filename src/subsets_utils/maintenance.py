@@ -0,0 +1,169 @@
+"""Delta table maintenance: compaction, Z-order, vacuum and checkpoints.
+
+Every upload_data and publish adds a commit (and usually small files), so
+tables slowly get more expensive to open and scan. maintain() checks a
+table's small-file count and commit-log length against thresholds and only
+does the work that is due:
+
+- more than MAINTENANCE_MAX_SMALL_FILES small files: compact them (or
+  Z-order by the given columns)
+- more than MAINTENANCE_MAX_VACUUMABLE_FILES files removed from the table
+  (by compaction, merges or overwrites) longer than
+  MAINTENANCE_RETENTION_HOURS ago: vacuum them
+- more than MAINTENANCE_MAX_LOG_LENGTH commits since the last checkpoint:
+  write a checkpoint and clean up expired log entries
+
+Usage:
+    python -m subsets_utils.maintenance big_mac_index pmms
+    python -m subsets_utils.maintenance big_mac_index --zorder date,country_code --force
+"""
+
+import argparse
+import json
+import os
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.compute as pc
+from deltalake import DeltaTable
+
+from .environment import get_data_dir, is_cloud_mode
+from .io import get_table
+from .r2 import download_bytes, get_connector_name
+
+TARGET_FILE_SIZE = int(os.environ.get('MAINTENANCE_TARGET_FILE_SIZE', str(128 * 1024 * 1024)))
+MAX_SMALL_FILES = int(os.environ.get('MAINTENANCE_MAX_SMALL_FILES', '8'))
+MAX_LOG_LENGTH = int(os.environ.get('MAINTENANCE_MAX_LOG_LENGTH', '20'))
+RETENTION_HOURS = int(os.environ.get('MAINTENANCE_RETENTION_HOURS', '168'))
+MAX_VACUUMABLE_FILES = int(os.environ.get('MAINTENANCE_MAX_VACUUMABLE_FILES', '0'))
+
+
+def _open_table(dataset_name: str) -> DeltaTable:
+    dt = get_table(dataset_name)
+    if dt is None:
+        raise FileNotFoundError(f"No Delta table found for {dataset_name}")
+    return dt
+
+
+def _last_checkpoint_version(dataset_name: str) -> int:
+    """Version of the table's latest checkpoint, or -1 if it has none."""
+    if is_cloud_mode():
+        key = f"{get_connector_name()}/data/subsets/{dataset_name}/_delta_log/_last_checkpoint"
+        data = download_bytes(key)
+    else:
+        path = Path(get_data_dir()) / "subsets" / dataset_name / "_delta_log" / "_last_checkpoint"
+        data = path.read_bytes() if path.exists() else None
+
+    if data is None:
+        return -1
+    return json.loads(data)["version"]
+
+
+def table_health(dataset_name: str, target_file_size: int = TARGET_FILE_SIZE,
+                 retention_hours: int = RETENTION_HOURS) -> dict:
+    """File and commit-log stats used to decide what maintenance is due.
+
+    Reads the Delta log, plus one listing of the table's files for a dry-run
+    vacuum.
+    """
+    dt = _open_table(dataset_name)
+    files = pa.table(dt.get_add_actions(flatten=True))
+    version = dt.version()
+
+    # Small files can only be compacted with others in the same partition,
+    # so a partition holding a single small file doesn't count
+    partition_columns = [col for col in files.column_names if col.startswith("partition.")]
+    small = files.filter(pc.less(files["size_bytes"], target_file_size // 2))
+    counts = small.group_by(partition_columns).aggregate([([], "count_all")])["count_all"]
+    small_files = pc.sum(pc.if_else(pc.greater(counts, 1), counts, 0)).as_py() or 0
+
+    return {
+        "version": version,
+        "files": files.num_rows,
+        "small_files": small_files,
+        "bytes": pc.sum(files["size_bytes"]).as_py() or 0,
+        "log_length": version - _last_checkpoint_version(dataset_name),
+        # Removed files past the retention window, i.e. what vacuum would delete
+        "vacuumable": len(dt.vacuum(retention_hours=retention_hours, dry_run=True, enforce_retention_duration=False)),
+    }
+
+
+def maintain(dataset_name: str, zorder_by: list[str] = None, force: bool = False,
+             target_file_size: int = TARGET_FILE_SIZE, retention_hours: int = RETENTION_HOURS,
+             max_small_files: int = MAX_SMALL_FILES, max_log_length: int = MAX_LOG_LENGTH,
+             max_vacuumable_files: int = MAX_VACUUMABLE_FILES) -> dict:
+    """Compact, vacuum and checkpoint a Delta table when its thresholds are exceeded.
+
+    In local mode: maintains DATA_DIR/subsets/{dataset_name}
+    In cloud mode: maintains s3://{bucket}/{connector}/data/subsets/{dataset_name}
+
+    Args:
+        dataset_name: Name of the dataset
+        zorder_by: Columns to Z-order by when compacting (plain compaction if None)
+        force: Run every step regardless of thresholds
+        target_file_size: Target size in bytes for compacted files
+        retention_hours: Age after which replaced files are vacuumed
+        max_small_files: Compact once more than this many files are under half
+            the target size
+        max_vacuumable_files: Vacuum once more than this many removed files
+            are older than retention_hours
+        max_log_length: Checkpoint once more than this many commits have been
+            made since the last checkpoint
+
+    Returns:
+        dict: The table's health before maintenance plus the number of files
+            compacted and vacuumed and whether a checkpoint was written
+    """
+    health = table_health(dataset_name, target_file_size, retention_hours)
+    summary = {**health, "compacted": 0, "vacuumed": 0, "checkpointed": False}
+
+    dt = _open_table(dataset_name)
+
+    if force or health["small_files"] > max_small_files:
+        if zorder_by:
+            metrics = dt.optimize.z_order(zorder_by, target_size=target_file_size)
+        else:
+            metrics = dt.optimize.compact(target_size=target_file_size)
+        summary["compacted"] = metrics["numFilesRemoved"]
+        print(
+            f"  -> Maintenance: {'Z-ordered' if zorder_by else 'Compacted'} {dataset_name}: "
+            f"{metrics['numFilesRemoved']} files -> {metrics['numFilesAdded']}"
+        )
+
+    if force or health["vacuumable"] > max_vacuumable_files:
+        removed = dt.vacuum(retention_hours=retention_hours, dry_run=False, enforce_retention_duration=False)
+        summary["vacuumed"] = len(removed)
+        print(f"  -> Maintenance: Vacuumed {len(removed)} files older than {retention_hours}h from {dataset_name}")
+
+    if force or summary["compacted"] or health["log_length"] > max_log_length:
+        dt.create_checkpoint()
+        dt.cleanup_metadata()
+        summary["checkpointed"] = True
+        print(f"  -> Maintenance: Checkpointed {dataset_name} at version {dt.version()}")
+
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact, vacuum and checkpoint Delta tables")
+    parser.add_argument("datasets", nargs="+", help="Dataset names to maintain")
+    parser.add_argument("--zorder", help="Comma-separated columns to Z-order by when compacting")
+    parser.add_argument("--force", action="store_true", help="Run every step regardless of thresholds")
+    parser.add_argument("--retention-hours", type=int, default=RETENTION_HOURS, help="Vacuum retention window")
+    parser.add_argument("--target-file-size", type=int, default=TARGET_FILE_SIZE, help="Target file size in bytes")
+    args = parser.parse_args()
+
+    zorder_by = [col.strip() for col in args.zorder.split(",")] if args.zorder else None
+    for dataset_name in args.datasets:
+        summary = maintain(
+            dataset_name,
+            zorder_by=zorder_by,
+            force=args.force,
+            target_file_size=args.target_file_size,
+            retention_hours=args.retention_hours
+        )
+        print(f"{dataset_name}: {summary['files']} files, {summary['log_length']} commits since last checkpoint")
+
+
+if __name__ == "__main__":
+    main()
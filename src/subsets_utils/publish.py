@@ -1,21 +1,33 @@
 import json
-from pathlib import Path
-from deltalake import DeltaTable
-from .environment import get_data_dir, is_cloud_mode
-from .r2 import get_delta_table_uri, get_storage_options
+from .io import get_table
+
+
+def _stored_metadata(dt) -> dict | None:
+    """The metadata dict last published to (or created with) the table."""
+    description = dt.metadata().description
+    if not description:
+        return None
+    try:
+        return json.loads(description)
+    except json.JSONDecodeError:
+        return None
+
 
 def publish(dataset_name: str, metadata: dict):
+    """Set the table description to the dataset metadata.
+
+    Tables created by upload_data(..., metadata=...) already carry it from
+    their first commit, and unchanged metadata is never re-committed, so
+    this usually costs no commit at all.
+    """
     if 'id' not in metadata:
         raise ValueError("Missing required field: 'id'")
     if 'title' not in metadata:
         raise ValueError("Missing required field: 'title'")
 
-    if is_cloud_mode():
-        table_uri = get_delta_table_uri(dataset_name)
-        dt = DeltaTable(table_uri, storage_options=get_storage_options())
-    else:
-        table_path = Path(get_data_dir()) / "subsets" / dataset_name
-        dt = DeltaTable(str(table_path))
+    dt = get_table(dataset_name)
+    if dt is None:
+        raise FileNotFoundError(f"No Delta table found for {dataset_name}")
 
     if 'column_descriptions' in metadata:
         schema = dt.schema().to_pyarrow() if hasattr(dt.schema(), 'to_pyarrow') else dt.schema().to_arrow()
@@ -27,5 +39,9 @@ def publish(dataset_name: str, metadata: dict):
         if invalid:
             raise ValueError(f"Invalid columns in descriptions: {sorted(invalid)}")
 
+    if _stored_metadata(dt) == metadata:
+        print(f"Metadata for {dataset_name} unchanged, skipping publish")
+        return
+
     dt.alter.set_table_description(json.dumps(metadata))
     print(f"Published metadata for {dataset_name}")
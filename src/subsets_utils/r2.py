@@ -6,10 +6,13 @@ Provides helper functions for R2 upload/download operations.
 
 import os
 import io
-from typing import Optional
+from typing import Optional, Iterable
 
 _s3_client = None
 
+# R2 requires every multipart part except the last to be the same size
+MULTIPART_PART_SIZE = 8 * 1024 * 1024
+
 
 def is_cloud_mode() -> bool:
     """Check if running in cloud mode (CI environment)."""
@@ -115,6 +118,67 @@ def upload_fileobj(fileobj: io.IOBase, key: str) -> str:
     return f"s3://{bucket}/{key}"
 
 
+def upload_stream(chunks: Iterable[bytes], key: str, part_size: int = MULTIPART_PART_SIZE) -> str:
+    """Upload an iterable of byte chunks to R2 without buffering the whole body.
+
+    Bodies smaller than one part are sent with a single put_object; larger
+    ones use a multipart upload with fixed-size parts, so at most one part is
+    held in memory. A failed multipart upload is aborted.
+
+    Args:
+        chunks: Iterable of bytes chunks, in order
+        key: Full key path in bucket
+        part_size: Size of each multipart part in bytes
+
+    Returns:
+        S3 URI of uploaded object
+    """
+    client = get_s3_client()
+    bucket = get_bucket_name()
+
+    buffer = bytearray()
+    parts = []
+    upload_id = None
+
+    def upload_part(body: bytes):
+        part_number = len(parts) + 1
+        response = client.upload_part(
+            Bucket=bucket,
+            Key=key,
+            PartNumber=part_number,
+            UploadId=upload_id,
+            Body=body
+        )
+        parts.append({'PartNumber': part_number, 'ETag': response['ETag']})
+
+    try:
+        for chunk in chunks:
+            buffer.extend(chunk)
+            while len(buffer) >= part_size:
+                if upload_id is None:
+                    upload_id = client.create_multipart_upload(Bucket=bucket, Key=key)['UploadId']
+                upload_part(bytes(buffer[:part_size]))
+                del buffer[:part_size]
+
+        if upload_id is None:
+            client.put_object(Bucket=bucket, Key=key, Body=bytes(buffer))
+        else:
+            if buffer:
+                upload_part(bytes(buffer))
+            client.complete_multipart_upload(
+                Bucket=bucket,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={'Parts': parts}
+            )
+    except Exception:
+        if upload_id is not None:
+            client.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+        raise
+
+    return f"s3://{bucket}/{key}"
+
+
 def download_bytes(key: str) -> Optional[bytes]:
     """Download bytes from R2.
 
@@ -3,11 +3,14 @@
 import pyarrow as pa
 import pyarrow.csv as csv
 import pyarrow.compute as pc
-from subsets_utils import load_raw_json, upload_data, publish
+from subsets_utils import load_raw_bytes, upload_changes, publish
 from .test import test
 
 DATASET_ID = "big_mac_index"
 
+# Natural key: one row per value of these columns
+KEY = ["date", "country_code"]
+
 METADATA = {
     "id": DATASET_ID,
     "title": "Big Mac Index",
@@ -60,10 +63,7 @@ COLUMN_MAPPING = {
 
 def run():
     """Transform Big Mac Index data."""
-    raw_data = load_raw_json("data_sources")
-    csv_text = raw_data["big_mac_index"]
-
-    table = csv.read_csv(pa.py_buffer(csv_text.encode()))
+    table = csv.read_csv(pa.py_buffer(load_raw_bytes("big_mac_index", "csv")))
 
     # Select and rename columns
     available = [col for col in COLUMN_MAPPING.keys() if col in table.column_names]
@@ -83,7 +83,7 @@ def run():
 
     test(table)
 
-    upload_data(table, DATASET_ID)
+    upload_changes(table, DATASET_ID, KEY, METADATA)
     publish(DATASET_ID, METADATA)
 
 
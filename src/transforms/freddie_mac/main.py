@@ -3,11 +3,14 @@
 import pyarrow as pa
 import pyarrow.csv as csv
 import pyarrow.compute as pc
-from subsets_utils import load_raw_json, upload_data, publish
+from subsets_utils import load_raw_bytes, upload_changes, publish
 from .test import test
 
 DATASET_ID = "freddie_mac_house_price_index"
 
+# Natural key: one row per value of these columns
+KEY = ["month", "geo_type", "geo_code", "geo_name"]
+
 METADATA = {
     "id": DATASET_ID,
     "title": "Freddie Mac House Price Index",
@@ -25,10 +28,7 @@ METADATA = {
 
 def run():
     """Transform Freddie Mac House Price Index data."""
-    raw_data = load_raw_json("data_sources")
-    csv_text = raw_data["freddie_mac"]
-
-    table = csv.read_csv(pa.py_buffer(csv_text.encode()))
+    table = csv.read_csv(pa.py_buffer(load_raw_bytes("freddie_mac", "csv")))
 
     # Build month column from Year and Month
     year_str = pc.cast(table.column("Year"), pa.string())
@@ -55,7 +55,7 @@ def run():
 
     test(output)
 
-    upload_data(output, DATASET_ID)
+    upload_changes(output, DATASET_ID, KEY, METADATA)
     publish(DATASET_ID, METADATA)
 
 
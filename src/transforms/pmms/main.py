@@ -3,11 +3,14 @@
 import pyarrow as pa
 import pyarrow.csv as csv
 import pyarrow.compute as pc
-from subsets_utils import load_raw_json, upload_data, publish
+from subsets_utils import load_raw_bytes, upload_changes, publish
 from .test import test
 
 DATASET_ID = "freddie_mac_mortgage_rates"
 
+# Natural key: one row per value of these columns
+KEY = ["date"]
+
 METADATA = {
     "id": DATASET_ID,
     "title": "Freddie Mac Mortgage Rates (PMMS)",
@@ -24,8 +27,7 @@ METADATA = {
 
 def run():
     """Transform PMMS mortgage rate data."""
-    raw_data = load_raw_json("data_sources")
-    csv_text = raw_data["pmms"]
+    csv_text = load_raw_bytes("pmms", "csv").decode("utf-8")
 
     # Parse CSV - read all columns as strings to handle varying column counts
     # After Nov 2022, ARM columns were dropped (9 cols -> 4 cols)
@@ -96,7 +98,7 @@ def run():
 
     test(output)
 
-    upload_data(output, DATASET_ID)
+    upload_changes(output, DATASET_ID, KEY, METADATA)
     publish(DATASET_ID, METADATA)
 
 
@@ -0,0 +1,22 @@
+import pyarrow as pa
+
+from subsets_utils.fingerprint import column_hash, combine, table_fingerprint
+
+
+def test_fingerprint_ignores_row_order():
+    table = pa.table({"k": [1, 2, 3], "v": ["a", "b", None]})
+    assert table_fingerprint(table.take([2, 0, 1])) == table_fingerprint(table)
+
+
+def test_fingerprint_detects_values_swapped_between_rows():
+    before = pa.table({"k": [1, 2, 3], "v": ["a", "b", "c"]})
+    after = pa.table({"k": [1, 2, 3], "v": ["b", "a", "c"]})
+    assert column_hash(before["v"]) == column_hash(after["v"])
+    assert table_fingerprint(before) != table_fingerprint(after)
+
+
+def test_combine_matches_fingerprint_of_appended_table():
+    first = pa.table({"k": [1, 2], "v": [0.5, None]})
+    second = pa.table({"k": [3], "v": [1.5]})
+    combined = combine(table_fingerprint(first), table_fingerprint(second))
+    assert combined == table_fingerprint(pa.concat_tables([first, second]))
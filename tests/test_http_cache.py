@@ -0,0 +1,14 @@
+from subsets_utils.http_client import CacheManager
+
+
+def test_cache_key_includes_url_query(tmp_path):
+    cache = CacheManager(tmp_path)
+    assert cache._cache_key("GET", "https://example.com/data?page=1") != cache._cache_key("GET", "https://example.com/data?page=2")
+
+
+def test_cache_key_merges_params_into_url_query(tmp_path):
+    cache = CacheManager(tmp_path)
+    assert cache._cache_key("GET", "https://example.com/data?page=1", params={"size": 10}) == \
+        cache._cache_key("GET", "https://example.com/data", params={"size": 10, "page": 1})
+    assert cache._cache_key("GET", "https://example.com/data?page=1", params={"size": 10}) != \
+        cache._cache_key("GET", "https://example.com/data?page=2", params={"size": 10})
@@ -0,0 +1,46 @@
+import pyarrow as pa
+import pytest
+
+from subsets_utils import load_asset, upload_changes
+from subsets_utils.io import get_table
+
+
+@pytest.fixture(autouse=True)
+def local_data_dir(tmp_path, monkeypatch):
+    monkeypatch.delenv("CI", raising=False)
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+
+
+def _data_files(dataset_name):
+    return set(get_table(dataset_name).file_uris())
+
+
+def test_unchanged_input_writes_nothing():
+    data = pa.table({"date": ["2024-01", "2024-02"], "rate": [6.5, 6.7]})
+    upload_changes(data, "rates", key="date")
+    files, version = _data_files("rates"), get_table("rates").version()
+
+    upload_changes(data, "rates", key="date")
+
+    assert _data_files("rates") == files
+    assert get_table("rates").version() == version
+
+
+def test_revised_rows_are_merged():
+    upload_changes(pa.table({"date": ["2024-01", "2024-02"], "rate": [6.5, 6.7]}), "rates", key="date")
+    upload_changes(pa.table({"date": ["2024-01", "2024-02", "2024-03"], "rate": [6.5, 6.9, 7.0]}), "rates", key="date")
+
+    stored = load_asset("rates").sort_by("date")
+    assert stored.to_pydict() == {"date": ["2024-01", "2024-02", "2024-03"], "rate": [6.5, 6.9, 7.0]}
+
+
+def test_added_column_is_stored_and_not_rewritten_again():
+    upload_changes(pa.table({"date": ["2024-01", "2024-02"], "rate": [6.5, 6.7]}), "rates", key="date")
+    data = pa.table({"date": ["2024-01", "2024-02"], "rate": [6.5, 6.7], "points": [0.5, 0.6]})
+
+    upload_changes(data, "rates", key="date")
+    assert load_asset("rates").sort_by("date").to_pydict() == data.to_pydict()
+
+    files = _data_files("rates")
+    upload_changes(data, "rates", key="date")
+    assert _data_files("rates") == files